@@ -7,17 +7,22 @@ Travelling Salesman Problem (TSP) benzeri problemler için uygular.
 """
 
 import numpy as np
-import random
-from typing import List, Tuple, Dict, Optional
+from typing import Any, List, Tuple, Dict, Optional
 import logging
 
+from aco.kernels import get_kernels
+
 logger = logging.getLogger(__name__)
 
 class ACO:
     """
     ACO sınıfı:
     - Mesafe matrisi (n x n) alır.
+    - Tur oluşturma, uzunluk hesabı ve feromon ekleme aco.kernels içindeki
+      çekirdeklerle (Numba veya NumPy) tüm karıncalar için tek seferde yapılır.
     - Her iterasyonda belirli sayıda karınca ile en kısa turu bulmaya çalışır.
+    - Durumu (feromon, en iyi tur, geçmiş, RNG) get_state()/set_state() ile
+      saklanıp geri yüklenebilir; run() kaldığı yerden devam eder.
     """
 
     def __init__(
@@ -28,7 +33,8 @@ class ACO:
         beta: float = 3.0,
         rho: float = 0.3,
         Q: float = 100,
-        seed: Optional[int] = None
+        seed: Optional[int] = None,
+        backend: str = "auto"
     ):
         """
         Args:
@@ -39,10 +45,12 @@ class ACO:
           - rho: Feromon buharlaşma oranı (0 < rho < 1).
           - Q: Feromon ekleme sabiti (Q / yol uzunluğu).
           - seed: Rastgele sayı üreteci için tohum (isteğe bağlı).
+          - backend: Hesaplama çekirdeği: "auto" (Numba kuruluysa derlenmiş,
+            değilse NumPy), "numba" veya "numpy".
         """
-        if seed is not None:
-            random.seed(seed)
-            np.random.seed(seed)
+        # Her örneğin kendi üreteci vardır; aynı süreçteki eşzamanlı çözümler
+        # (ör. farklı Streamlit oturumları) birbirlerinin çekilişlerini bozmaz
+        self.rng = np.random.default_rng(seed)
 
         # Mesafe matrisini kopya al ve diyagonali küçük bir değere ayarla (sıfır olmasın)
         self.distances = distance_matrix.copy()
@@ -52,39 +60,61 @@ class ACO:
         self.ant_count = ant_count
         self.alpha = alpha
         self.beta = beta
+        # Sabit sezgisel bilgi: (1/mesafe)^beta
+        self._heuristic = (1.0 / self.distances) ** self.beta
         self.rho = rho
         self.Q = Q
+        self.kernels = get_kernels(backend)
 
         # Başlangıç feromon matrisi: tüm kenarlar için 0.1 (örnek değer)
         self.pheromone = np.ones((self.num_nodes, self.num_nodes)) * 0.1
 
-    def _select_next_node(self, current: int, visited: List[int]) -> Optional[int]:
+        # Çalıştırmalar arasında korunan en iyi çözüm ve iterasyon geçmişi
+        self.best_route: List[int] = []
+        self.best_length: float = float("inf")
+        self.history: List[Dict] = []
+
+    def get_state(self) -> Dict[str, Any]:
         """
-        Mevcut düğümden (şehirden) sonraki düğümü
-        feromon ve mesafe ağırlıklı olasılıkla seçer.
-        Args:
-          - current: Bulunulan düğüm (indeks).
-          - visited: Şu ana kadar ziyaret edilen düğümler listesi.
+        Algoritmanın devam ettirilebilir durumunu döner: feromon matrisi,
+        en iyi tur, geçmiş ve örneğe ait rastgele sayı üretecinin durumu.
+        """
+        return {
+            "pheromone": self.pheromone.copy(),
+            "best_route": list(self.best_route),
+            "best_length": self.best_length,
+            "history": list(self.history),
+            "rng_state": self.rng.bit_generator.state,
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """
+        get_state() ile alınmış bir durumu geri yükler. Sonraki run() çağrısı,
+        aynı tohumla baştan daha fazla iterasyon çalıştırmakla aynı sonucu verir.
+        """
+        if state["pheromone"].shape != self.pheromone.shape:
+            raise ValueError("Durumdaki feromon matrisi boyutu mesafe matrisiyle uyuşmuyor.")
+        self.pheromone = state["pheromone"].copy()
+        self.best_route = list(state["best_route"])
+        self.best_length = state["best_length"]
+        self.history = list(state["history"])
+        self.rng.bit_generator.state = state["rng_state"]
+
+    def _construct_tours(self) -> np.ndarray:
+        """
+        Tüm karıncaların turlarını seçili çekirdekle tek seferde oluşturur.
+        Her karınca rastgele bir başlangıçtan, her adımda ziyaret edilmemiş
+        düğümler arasından pheromone^alpha * (1/mesafe)^beta ağırlıklı rulet
+        seçimiyle ilerler ve başlangıca döner.
         Returns:
-          - Seçilen bir sonraki düğüm indeksi veya None (ziyaret edilecek kalmadıysa).
+          - (ant_count x n+1) tur dizisi.
         """
-        unvisited = [i for i in range(self.num_nodes) if i not in visited]
-        if not unvisited:
-            return None
-
-        # Feromon ** alpha ve (1 / mesafe) ** beta hesapları
-        pher_vals = self.pheromone[current, unvisited] ** self.alpha
-        heur_vals = (1.0 / self.distances[current, unvisited]) ** self.beta
-        probs = pher_vals * heur_vals
-        total = probs.sum()
-        if total <= 0:
-            # Tüm olasılıklar sıfırsa rastgele bir düğüm seç
-            return random.choice(unvisited)
-
-        probs = probs / total
-        return np.random.choice(unvisited, p=probs)
-
-    def _update_pheromones(self, all_routes: List[List[int]], all_lengths: List[float]) -> None:
+        weights = (self.pheromone ** self.alpha) * self._heuristic
+        starts = self.rng.integers(0, self.num_nodes, size=self.ant_count)
+        rand = self.rng.random((self.ant_count, max(self.num_nodes - 1, 0)))
+        return self.kernels.construct_tours(weights, starts, rand)
+
+    def _update_pheromones(self, tours: np.ndarray, lengths: np.ndarray) -> None:
         """
         Tüm karıncaların yollarına göre feromonları günceller:
           1. Buharlaşma: pheromone *= (1 - rho)
@@ -94,63 +124,42 @@ class ACO:
         self.pheromone *= (1 - self.rho)
 
         # 2) Yeni feromon ekleme
-        for route, length in zip(all_routes, all_lengths):
-            delta = self.Q / length
-            for i in range(len(route) - 1):
-                a, b = route[i], route[i + 1]
-                self.pheromone[a, b] += delta
-                self.pheromone[b, a] += delta
+        self.kernels.deposit(self.pheromone, tours, lengths, float(self.Q))
 
     def run(self, iterations: int = 100) -> Tuple[List[int], float, List[Dict]]:
         """
         ACO algoritmasını belirtilen iterasyon sayısı kadar çalıştırır.
+        Önceki bir run() veya set_state() varsa kaldığı yerden devam eder.
         Args:
-          - iterations: Toplam iterasyon (tur) sayısı.
+          - iterations: Bu çağrıda çalıştırılacak iterasyon (tur) sayısı.
         Returns:
           - best_route: En iyi rota (şehir/nokta indeksleri, başlangıca dönüş dahil).
           - best_length: En iyi rotanın toplam mesafesi (kilometre).
-          - history: Her iterasyondaki istatistikler listesi (dict içinde
+          - history: Tüm iterasyonların istatistikleri listesi (dict içinde
                      iteration, best_distance, average_distance, worst_distance).
         """
-        best_route: List[int] = []
-        best_length: float = float("inf")
-        history: List[Dict] = []
-
-        for it in range(1, iterations + 1):
-            all_routes: List[List[int]] = []
-            all_lengths: List[float] = []
-
-            # Her karınca için bir rota oluştur
-            for _ in range(self.ant_count):
-                start = random.randint(0, self.num_nodes - 1)
-                route = [start]
-
-                # Tüm düğümleri ziyaret et (sonra start’a dönüş)
-                while len(route) < self.num_nodes:
-                    nxt = self._select_next_node(route[-1], route)
-                    if nxt is None:
-                        break
-                    route.append(nxt)
-                route.append(route[0])  # Başlangıca geri dönüş
-
-                # Toplam mesafeyi hesapla
-                length = sum(
-                    self.distances[route[i], route[i + 1]]
-                    for i in range(len(route) - 1)
-                )
-                all_routes.append(route)
-                all_lengths.append(length)
-
-                # En iyi çözümü güncelle
-                if length < best_length:
-                    best_length = length
-                    best_route = route.copy()
+        best_route: List[int] = list(self.best_route)
+        best_length: float = self.best_length
+        history: List[Dict] = self.history
+
+        done = len(history)
+        total = done + iterations
+        for it in range(done + 1, total + 1):
+            # Her karınca için bir rota oluştur ve toplam mesafeleri hesapla
+            tours = self._construct_tours()
+            lengths = self.kernels.tour_lengths(self.distances, tours)
+
+            # En iyi çözümü güncelle
+            best_ant = int(np.argmin(lengths))
+            if lengths[best_ant] < best_length:
+                best_length = float(lengths[best_ant])
+                best_route = tours[best_ant].tolist()
 
             # Her iterasyonda feromonları güncelle
-            self._update_pheromones(all_routes, all_lengths)
+            self._update_pheromones(tours, lengths)
 
-            avg_length = float(np.mean(all_lengths))
-            worst_length = float(np.max(all_lengths))
+            avg_length = float(np.mean(lengths))
+            worst_length = float(np.max(lengths))
             history.append({
                 "iteration": it,
                 "best_distance": best_length,
@@ -159,10 +168,12 @@ class ACO:
             })
 
             logger.info(
-                f"[Iterasyon {it}/{iterations}] "
+                f"[Iterasyon {it}/{total}] "
                 f"En İyi={best_length:.2f} km, "
                 f"Ortalama={avg_length:.2f} km, "
                 f"En Kötü={worst_length:.2f} km"
             )
 
-        return best_route, best_length, history
+        self.best_route = best_route
+        self.best_length = best_length
+        return best_route, best_length, list(history)
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+src/aco/cache.py
+
+Çözülmüş rotalar için sonuç önbelleği:
+- Anahtar; snap edilmiş node dizisi, mesafe kaynağı (backend) ve ACO
+  parametrelerinin (alpha, beta, rho, Q, ant_count, seed) özetidir (SHA-256).
+- Bellekte kayıt sayısı ve tahmini bayt ile sınırlı bir LRU'da tutulur; istenirse
+  diske (pickle) de yazılır ve disk klasörü bayt sınırını aşınca en eski
+  dosyalar silinir.
+- Her kayıt rota, uzunluk, geçmiş ve devam ettirilebilir ACO durumunu tutar;
+  aynı duraklar için daha fazla iterasyon istenirse çözüm kaldığı yerden sürer.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from aco.algorithm import ACO
+
+logger = logging.getLogger(__name__)
+
+# Anahtara giren ACO parametreleri (iterasyon sayısı kayıtta ayrıca tutulur)
+KEY_PARAMS = ("alpha", "beta", "rho", "Q", "ant_count", "seed")
+
+# Kayıt biçimi sürümü; ACO durumunun içeriği değiştiğinde artırılır ki eski
+# disk kayıtları yeni sürümle devam ettirilmeye çalışılmasın
+CACHE_FORMAT = 2
+
+# Bellekteki kayıtların toplam sınırı (her kayıt n x n feromon matrisi içerir)
+DEFAULT_MAX_BYTES = 500_000_000
+# Disk klasörünün toplam sınırı
+DEFAULT_DISK_MAX_BYTES = 2_000_000_000
+
+def estimate_entry_bytes(entry: Dict[str, Any]) -> int:
+    """
+    Bir kaydın bellekte kapladığı alanı, baskın olan feromon matrisinden
+    ve rota/geçmiş uzunluklarından kabaca tahmin eder.
+    """
+    state = entry.get("state") or {}
+    pheromone = state.get("pheromone")
+    size = pheromone.nbytes if pheromone is not None else 0
+    return size + 64 * len(entry.get("route", ())) + 256 * len(entry.get("history", ()))
+
+class RouteCache:
+    """
+    Kayıt sayısı ve bayt sınırlı LRU, opsiyonel disk kalıcılığı olan rota sonuç önbelleği.
+    get() de LRU sırasını değiştirdiği ve bir çözüm biterken başka bir istek
+    okuyabildiği için bellek işlemleri tek bir kilitle yapılır.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        cache_dir: Optional[Union[str, Path]] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        disk_max_bytes: int = DEFAULT_DISK_MAX_BYTES
+    ):
+        """
+        Args:
+          - maxsize: Bellekte tutulacak en fazla kayıt sayısı.
+          - cache_dir: Verilirse kayıtlar bu klasöre <anahtar>.pkl olarak yazılır.
+          - max_bytes: Bellekteki kayıtların tahmini toplam boyut sınırı.
+          - disk_max_bytes: Disk klasörünün toplam boyut sınırı.
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize en az 1 olmalıdır.")
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(nodes: Sequence[int], backend: str, params: Dict[str, Any]) -> str:
+        """
+        Node dizisi, mesafe kaynağı ve ACO parametrelerinden önbellek anahtarı üretir.
+        Node sırası korunur, çünkü rota indeksleri durak sırasına göre tutulur.
+        """
+        payload = {
+            "nodes": [int(nd) for nd in nodes],
+            "backend": backend,
+            "params": {name: params.get(name) for name in KEY_PARAMS},
+            "format": CACHE_FORMAT,
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=float).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    @property
+    def total_bytes(self) -> int:
+        """
+        Bellekteki kayıtların tahmini toplam boyutu.
+        """
+        with self._lock:
+            return self._total_bytes
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{key}.pkl"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Kaydı döner (bellekte yoksa diskten yükler); yoksa None.
+        """
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                return cached[0]
+
+        path = self._disk_path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logger.warning(f"Önbellek kaydı okunamadı ({path}): {e}")
+            return None
+        try:
+            os.utime(path)  # diskteki LRU sırası için son kullanım zamanı
+        except OSError:
+            pass
+        self._store(key, entry)
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        """
+        Kaydı belleğe (ve varsa diske) yazar; sınır aşılırsa en eski kayıt atılır.
+        """
+        self._store(key, entry)
+        path = self._disk_path(key)
+        if path is not None:
+            # Her yazıcı kendi geçici dosyasına yazar; aynı anahtarı yazan oturumlar çakışmaz
+            with tempfile.NamedTemporaryFile(
+                dir=self.cache_dir, prefix=f"{key}.", suffix=".tmp", delete=False
+            ) as f:
+                tmp_path = Path(f.name)
+                try:
+                    pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+                except Exception:
+                    f.close()
+                    tmp_path.unlink(missing_ok=True)
+                    raise
+            tmp_path.replace(path)
+            self._prune_disk(keep=path)
+
+    def _store(self, key: str, entry: Dict[str, Any]) -> None:
+        size = estimate_entry_bytes(entry)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old[1]
+            self._entries[key] = (entry, size)
+            self._total_bytes += size
+            # Sınırlar aşılıyorsa en eski kayıtları at (yeni kayıt her zaman kalır)
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.maxsize or self._total_bytes > self.max_bytes
+            ):
+                _, (_, old_size) = self._entries.popitem(last=False)
+                self._total_bytes -= old_size
+
+    def _prune_disk(self, keep: Path) -> None:
+        """
+        Disk klasörü disk_max_bytes sınırını aşıyorsa, son kullanım zamanı en eski
+        kayıt dosyalarını siler (yeni yazılan dosya korunur).
+        """
+        files = []
+        for file in self.cache_dir.glob("*.pkl"):
+            try:
+                stat = file.stat()
+            except OSError:
+                continue  # başka bir oturum silmiş olabilir
+            files.append((stat.st_mtime, stat.st_size, file))
+        total = sum(size for _, size, _ in files)
+        for _, size, file in sorted(files, key=lambda item: item[0]):
+            if total <= self.disk_max_bytes:
+                break
+            if file == keep:
+                continue
+            file.unlink(missing_ok=True)
+            total -= size
+
+def run_cached(
+    cache: RouteCache,
+    key: str,
+    distance_matrix: np.ndarray,
+    iterations: int,
+    **aco_params
+) -> Tuple[List[int], float, List[Dict], str]:
+    """
+    ACO'yu önbellek üzerinden çalıştırır.
+    - Aynı anahtar ve aynı iterasyon sayısı: kayıt doğrudan döner ("hit").
+    - Aynı anahtar, daha az iterasyonlu kayıt: kayıtlı durumdan eksik
+      iterasyonlar kadar devam edilir ("resume").
+    - Aksi halde baştan çözülür ("miss"). Kayıt istenenden daha fazla
+      iterasyonluysa, daha uzun çözüm korunur ve kısa çalıştırma kaydedilmez.
+    Args:
+      - cache: RouteCache örneği.
+      - key: RouteCache.make_key() ile üretilmiş anahtar.
+      - distance_matrix: (n x n) mesafe matrisi.
+      - iterations: İstenen toplam iterasyon sayısı.
+      - aco_params: ACO yapıcısına geçilecek parametreler.
+    Returns:
+      - (best_route, best_length, history, durum) dörtlüsü.
+    """
+    entry = cache.get(key)
+    if entry is not None and entry["iterations"] == iterations:
+        return list(entry["route"]), entry["length"], list(entry["history"]), "hit"
+
+    aco = ACO(distance_matrix=distance_matrix, **aco_params)
+    remaining = iterations
+    status = "miss"
+    if entry is not None and entry["iterations"] < iterations:
+        aco.set_state(entry["state"])
+        remaining = iterations - entry["iterations"]
+        status = "resume"
+
+    best_route, best_length, history = aco.run(iterations=remaining)
+    if entry is not None and entry["iterations"] > iterations:
+        return best_route, best_length, history, status
+
+    cache.put(key, {
+        "route": best_route,
+        "length": best_length,
+        "history": history,
+        "iterations": iterations,
+        "state": aco.get_state(),
+    })
+    return best_route, best_length, history, status
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+src/aco/kernels.py
+
+ACO'nun sıcak döngüleri için hesaplama çekirdekleri:
+- construct_tours: Tüm karıncalar için rulet seçimiyle tur oluşturma.
+- tour_lengths: Turların toplam uzunlukları.
+- deposit: Turlar üzerine feromon bırakma.
+
+Numba kuruluysa çekirdekler njit ile derlenir (tur oluşturma karıncalar
+üzerinde paralel) ve derleme sonucu diske önbelleklenir; kurulu değilse
+karıncalar üzerinde vektörel çalışan saf NumPy sürümleri kullanılır.
+Her iki arka uç da rastgele sayıları dışarıdan aldığı için aynı tohumla
+aynı seçim kurallarını uygular. Ancak toplamlar farklı sırayla yapıldığından
+sonuçlar yalnızca kayan nokta yuvarlamasına kadar eşleşir (tur uzunluklarında
+~1e-14 mertebesinde fark; eşiğe çok yakın rulet seçimlerinde farklı düğüm).
+"""
+
+from typing import Callable, NamedTuple
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # Numba opsiyoneldir
+    NUMBA_AVAILABLE = False
+
+class Kernels(NamedTuple):
+    """
+    Seçilen arka uca ait çekirdek fonksiyonları.
+    """
+    name: str
+    construct_tours: Callable[[np.ndarray, np.ndarray, np.ndarray], np.ndarray]
+    tour_lengths: Callable[[np.ndarray, np.ndarray], np.ndarray]
+    deposit: Callable[[np.ndarray, np.ndarray, np.ndarray, float], None]
+
+# ---------------------------------------------------------------------------
+# Saf NumPy çekirdekleri (karıncalar üzerinde vektörel)
+# ---------------------------------------------------------------------------
+
+def construct_tours_numpy(weights: np.ndarray, starts: np.ndarray, rand: np.ndarray) -> np.ndarray:
+    """
+    Tüm karıncaların turlarını adım adım, karıncalar üzerinde vektörel olarak oluşturur.
+    Args:
+      - weights: (n x n) seçim ağırlıkları (feromon^alpha * (1/mesafe)^beta).
+      - starts: (m,) karıncaların başlangıç düğümleri.
+      - rand: (m x n-1) [0, 1) aralığında rastgele sayılar (adım başına bir tane).
+    Returns:
+      - (m x n+1) tur dizisi (son sütun başlangıca dönüş).
+    """
+    m = starts.shape[0]
+    n = weights.shape[0]
+    rows = np.arange(m)
+
+    tours = np.empty((m, n + 1), dtype=np.int64)
+    tours[:, 0] = starts
+    visited = np.zeros((m, n), dtype=bool)
+    visited[rows, starts] = True
+    current = starts.astype(np.int64)
+
+    for step in range(1, n):
+        w = weights[current]
+        w[visited] = 0.0
+        cum = np.cumsum(w, axis=1)
+        total = cum[:, -1]
+        u = rand[:, step - 1]
+
+        # Rulet: kümülatif ağırlığın hedefi ilk aştığı düğüm
+        nxt = (cum <= (u * total)[:, None]).sum(axis=1)
+
+        unvisited = ~visited
+        # Tüm ağırlıklar sıfırsa ziyaret edilmemişler arasından düzgün seçim
+        zero = total <= 0.0
+        if zero.any():
+            k = (u[zero] * unvisited[zero].sum(axis=1)).astype(np.int64)
+            nxt[zero] = np.argmax(np.cumsum(unvisited[zero], axis=1) > k[:, None], axis=1)
+        # Yuvarlama nedeniyle hedef aşılamadıysa son ziyaret edilmemiş düğüm
+        over = nxt >= n
+        if over.any():
+            nxt[over] = n - 1 - np.argmax(unvisited[over, ::-1], axis=1)
+
+        tours[:, step] = nxt
+        visited[rows, nxt] = True
+        current = nxt
+
+    tours[:, n] = tours[:, 0]
+    return tours
+
+def tour_lengths_numpy(distances: np.ndarray, tours: np.ndarray) -> np.ndarray:
+    """
+    (m x n+1) tur dizisindeki her turun toplam uzunluğunu döner.
+    """
+    return distances[tours[:, :-1], tours[:, 1:]].sum(axis=1)
+
+def deposit_numpy(pheromone: np.ndarray, tours: np.ndarray, lengths: np.ndarray, Q: float) -> None:
+    """
+    Her turun kenarlarına (iki yönde) Q / uzunluk kadar feromon ekler (yerinde).
+    """
+    steps = tours.shape[1] - 1
+    delta = np.repeat(Q / lengths, steps)
+    a = tours[:, :-1].ravel()
+    b = tours[:, 1:].ravel()
+    np.add.at(pheromone, (a, b), delta)
+    np.add.at(pheromone, (b, a), delta)
+
+NUMPY_KERNELS = Kernels("numpy", construct_tours_numpy, tour_lengths_numpy, deposit_numpy)
+
+# ---------------------------------------------------------------------------
+# Numba çekirdekleri (NumPy sürümleriyle aynı seçim kuralları)
+# ---------------------------------------------------------------------------
+
+if NUMBA_AVAILABLE:
+
+    @njit(parallel=True, cache=True)
+    def construct_tours_numba(weights, starts, rand):
+        m = starts.shape[0]
+        n = weights.shape[0]
+        tours = np.empty((m, n + 1), dtype=np.int64)
+
+        for ant in prange(m):
+            visited = np.zeros(n, dtype=np.bool_)
+            current = starts[ant]
+            tours[ant, 0] = current
+            visited[current] = True
+
+            for step in range(1, n):
+                u = rand[ant, step - 1]
+                total = 0.0
+                for j in range(n):
+                    if not visited[j]:
+                        total += weights[current, j]
+
+                nxt = -1
+                if total > 0.0:
+                    target = u * total
+                    acc = 0.0
+                    last = -1
+                    for j in range(n):
+                        if not visited[j]:
+                            acc += weights[current, j]
+                            last = j
+                            if acc > target:
+                                nxt = j
+                                break
+                    if nxt == -1:
+                        nxt = last
+                else:
+                    k = int(u * (n - step))
+                    for j in range(n):
+                        if not visited[j]:
+                            if k == 0:
+                                nxt = j
+                                break
+                            k -= 1
+
+                tours[ant, step] = nxt
+                visited[nxt] = True
+                current = nxt
+
+            tours[ant, n] = tours[ant, 0]
+        return tours
+
+    @njit(parallel=True, cache=True)
+    def tour_lengths_numba(distances, tours):
+        m = tours.shape[0]
+        steps = tours.shape[1] - 1
+        lengths = np.empty(m, dtype=np.float64)
+        for ant in prange(m):
+            total = 0.0
+            for i in range(steps):
+                total += distances[tours[ant, i], tours[ant, i + 1]]
+            lengths[ant] = total
+        return lengths
+
+    @njit(cache=True)
+    def deposit_numba(pheromone, tours, lengths, Q):
+        # Aynı kenara birden çok karınca yazabildiği için seri çalışır
+        m = tours.shape[0]
+        steps = tours.shape[1] - 1
+        for ant in range(m):
+            delta = Q / lengths[ant]
+            for i in range(steps):
+                a = tours[ant, i]
+                b = tours[ant, i + 1]
+                pheromone[a, b] += delta
+                pheromone[b, a] += delta
+
+    NUMBA_KERNELS = Kernels("numba", construct_tours_numba, tour_lengths_numba, deposit_numba)
+
+def init_pool_worker() -> None:
+    """
+    Süreç havuzu işçileri için başlatıcı: Numba'nın paralel çekirdeklerini tek
+    iş parçacığıyla sınırlar. Aksi halde N işçinin her biri ~N iş parçacığı
+    açar ve CPU N² iş parçacığıyla aşırı yüklenir.
+    """
+    if NUMBA_AVAILABLE:
+        import numba
+
+        numba.set_num_threads(1)
+
+def get_kernels(backend: str = "auto") -> Kernels:
+    """
+    İstenen arka uca ait çekirdekleri döner.
+    Args:
+      - backend: "auto" (Numba varsa Numba, yoksa NumPy), "numba" veya "numpy".
+    """
+    if backend == "auto":
+        return NUMBA_KERNELS if NUMBA_AVAILABLE else NUMPY_KERNELS
+    if backend == "numba":
+        if not NUMBA_AVAILABLE:
+            raise ImportError("Numba arka ucu için 'numba' paketi kurulu olmalıdır.")
+        return NUMBA_KERNELS
+    if backend == "numpy":
+        return NUMPY_KERNELS
+    raise ValueError(f"Geçersiz çekirdek arka ucu: {backend}")
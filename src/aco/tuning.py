@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+src/aco/tuning.py
+
+ACO parametrelerinin (alpha, beta, rho, Q, ant_count) çevrimdışı ve paralel
+olarak ayarlanması (F-race yöntemi):
+- Aday konfigürasyonlar, eğitim örnekleri (blok) üzerinde bir süreç havuzunda
+  birlikte çalıştırılır.
+- Yeterli blok toplandıktan sonra her adımda Friedman testi yapılır; anlamlı
+  fark varsa en iyiden istatistiksel olarak kötü olan adaylar elenir.
+- En iyi konfigürasyon, örnek boyutu bandı başına JSON ön ayar dosyasına yazılır
+  ve uygulama tarafından load_preset() ile otomatik yüklenir.
+"""
+
+import json
+import logging
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from statistics import NormalDist
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from aco.algorithm import ACO
+from aco.kernels import init_pool_worker
+
+logger = logging.getLogger(__name__)
+
+# Ayarlanan ön ayarların varsayılan konumu (src/data/aco_presets.json)
+DEFAULT_PRESETS_PATH = Path(__file__).resolve().parent.parent / "data" / "aco_presets.json"
+
+# Örnek boyutu bantları: (en az, en çok) nokta sayısı; None = üst sınır yok
+SIZE_BANDS: Tuple[Tuple[int, Optional[int]], ...] = (
+    (2, 25),
+    (26, 100),
+    (101, 500),
+    (501, None),
+)
+
+# Arayüzdeki kaydırıcılarla aynı aralık ve adımlar
+PARAM_SPACE = {
+    "alpha": (0.1, 5.0, 0.1),
+    "beta": (0.1, 5.0, 0.1),
+    "rho": (0.01, 1.0, 0.01),
+    "Q": (1, 500, 1),
+    "ant_count": (2, 100, 1),
+}
+
+# Arayüzün ön ayar yokken kullandığı değerler; her yarışa referans aday olarak
+# eklenir, böylece ön ayar bugünkü varsayılanlarla karşılaştırılarak seçilir
+DEFAULT_CONFIG = {"alpha": 1.0, "beta": 3.0, "rho": 0.3, "Q": 100, "ant_count": 20}
+
+# İşçi süreçteki eğitim örnekleri; havuz başlatılırken bir kez aktarılır
+_worker_instances: Sequence[np.ndarray] = ()
+
+def _init_worker(instances: Sequence[np.ndarray]) -> None:
+    """
+    Yarış işçisini başlatır: eğitim örneklerini bir kez alır ve Numba'yı tek
+    iş parçacığıyla sınırlar.
+    """
+    global _worker_instances
+    _worker_instances = instances
+    init_pool_worker()
+
+def band_label(n: int) -> Optional[str]:
+    """
+    Nokta sayısının düştüğü bandın etiketini ("26-100", "501+" gibi) döner.
+    """
+    for low, high in SIZE_BANDS:
+        if n >= low and (high is None or n <= high):
+            return f"{low}+" if high is None else f"{low}-{high}"
+    return None
+
+def sample_configurations(count: int, seed: Optional[int] = None) -> List[Dict]:
+    """
+    Parametre uzayından rastgele aday konfigürasyonlar üretir.
+    Varsayılan konfigürasyon her zaman ilk aday olarak eklenir.
+    """
+    rng = random.Random(seed)
+    configs = [dict(DEFAULT_CONFIG)]
+    for _ in range(max(count - 1, 0)):
+        config = {}
+        for name, (low, high, step) in PARAM_SPACE.items():
+            steps = int(round((high - low) / step))
+            value = low + rng.randint(0, steps) * step
+            config[name] = int(value) if isinstance(step, int) else round(value, 2)
+        configs.append(config)
+    return configs
+
+def _average_ranks(results: np.ndarray) -> np.ndarray:
+    """
+    Her satırı (blok) kendi içinde sıralar; eşit değerlere ortalama sıra verilir.
+    """
+    ranks = np.empty_like(results, dtype=float)
+    for r, row in enumerate(results):
+        order = np.argsort(row, kind="mergesort")
+        _, inverse, counts = np.unique(row[order], return_inverse=True, return_counts=True)
+        ends = np.cumsum(counts)
+        ranks[r, order] = ((ends - counts + 1 + ends) / 2.0)[inverse]
+    return ranks
+
+def _chi2_quantile(p: float, df: int) -> float:
+    """
+    Ki-kare dağılımı kantili (Wilson-Hilferty yaklaşımı).
+    """
+    z = NormalDist().inv_cdf(p)
+    h = 2.0 / (9.0 * df)
+    return df * (1.0 - h + z * math.sqrt(h)) ** 3
+
+def _t_quantile(p: float, df: int) -> float:
+    """
+    Student-t dağılımı kantili (Cornish-Fisher açılımı).
+    """
+    z = NormalDist().inv_cdf(p)
+    return (
+        z
+        + (z ** 3 + z) / (4 * df)
+        + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+        + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3)
+    )
+
+def friedman_eliminate(results: np.ndarray, confidence: float = 0.95) -> np.ndarray:
+    """
+    F-race eleme adımı: Friedman testi anlamlıysa, Conover çoklu
+    karşılaştırmasına göre en iyi adaydan kötü olanları eler.
+    Args:
+      - results: (blok x aday) boyutlu tur uzunlukları (küçük daha iyi).
+      - confidence: Testin güven düzeyi.
+    Returns:
+      - Hayatta kalan adayları gösteren boolean maske.
+    """
+    b, k = results.shape
+    keep = np.ones(k, dtype=bool)
+    if k < 2 or b < 2:
+        return keep
+
+    ranks = _average_ranks(results)
+    rank_sums = ranks.sum(axis=0)
+    a1 = float((ranks ** 2).sum())
+    c1 = b * k * (k + 1) ** 2 / 4.0
+    if a1 - c1 <= 0:
+        return keep  # tüm bloklarda tam eşitlik
+
+    t1 = (k - 1) * float(((rank_sums - b * (k + 1) / 2.0) ** 2).sum()) / (a1 - c1)
+    if t1 <= _chi2_quantile(confidence, k - 1):
+        return keep
+
+    dof = (b - 1) * (k - 1)
+    spread = math.sqrt(max(2 * b * (a1 - c1) * (1 - t1 / (b * (k - 1))) / dof, 0.0))
+    threshold = _t_quantile(1 - (1 - confidence) / 2, dof) * spread
+    best = rank_sums.min()
+    return (rank_sums - best) <= threshold
+
+def _evaluate(task: Tuple[int, Dict, int, int]) -> float:
+    """
+    Tek bir (örnek indeksi, konfigürasyon) çiftini çalıştırır ve en iyi tur uzunluğunu döner.
+    Görevde mesafe matrisi yerine yalnızca örnek indeksi taşınır.
+    """
+    instance_idx, config, iterations, seed = task
+    aco = ACO(distance_matrix=_worker_instances[instance_idx], seed=seed, **config)
+    _, best_length, _ = aco.run(iterations=iterations)
+    return best_length
+
+def race(
+    configs: List[Dict],
+    instances: Sequence[np.ndarray],
+    iterations: int = 50,
+    repeats: int = 1,
+    min_blocks: int = 5,
+    confidence: float = 0.95,
+    max_workers: Optional[int] = None,
+    seed: int = 0
+) -> Tuple[Dict, List[Dict]]:
+    """
+    Aday konfigürasyonları F-race ile yarıştırır.
+    Args:
+      - configs: Aday konfigürasyon listesi (alpha, beta, rho, Q, ant_count).
+      - instances: Eğitim örneklerinin mesafe matrisleri.
+      - iterations: Her çalıştırmadaki ACO iterasyon sayısı (yakınsama bütçesi).
+      - repeats: Her örneğin farklı tohumlarla kaç blok olarak kullanılacağı.
+      - min_blocks: İlk istatistiksel testten önce toplanacak blok sayısı.
+      - confidence: Friedman testinin güven düzeyi.
+      - max_workers: Süreç havuzu boyutu (None = CPU sayısı).
+      - seed: Blok sırası ve ACO tohumları için temel tohum.
+    Returns:
+      - (en iyi konfigürasyon, hayatta kalan konfigürasyonlar)
+    """
+    if not configs:
+        raise ValueError("En az bir aday konfigürasyon gereklidir.")
+    if not instances:
+        raise ValueError("En az bir eğitim örneği gereklidir.")
+
+    blocks = [(idx, seed + rep) for rep in range(repeats) for idx in range(len(instances))]
+    random.Random(seed).shuffle(blocks)
+
+    alive = np.arange(len(configs))
+    results: List[np.ndarray] = []  # her blok için tüm adayların sonuçları (elenmişler NaN)
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(list(instances),)
+    ) as pool:
+        for b, (idx, block_seed) in enumerate(blocks, start=1):
+            tasks = [(idx, configs[c], iterations, block_seed) for c in alive]
+            row = np.full(len(configs), np.nan)
+            row[alive] = list(pool.map(_evaluate, tasks))
+            results.append(row)
+
+            if b >= min_blocks and len(alive) > 1:
+                survivors = friedman_eliminate(np.vstack(results)[:, alive], confidence)
+                if not survivors.all():
+                    logger.info(f"[Blok {b}] {int((~survivors).sum())} aday elendi, {int(survivors.sum())} kaldı.")
+                alive = alive[survivors]
+            if len(alive) == 1:
+                break
+
+    ranks = _average_ranks(np.vstack(results)[:, alive])
+    best = alive[int(np.argmin(ranks.mean(axis=0)))]
+    return dict(configs[best]), [dict(configs[c]) for c in alive]
+
+def load_presets(path: Union[str, Path] = DEFAULT_PRESETS_PATH) -> Dict[str, Dict]:
+    """
+    Ön ayar dosyasını okur. Format: { "26-100": {"alpha": ..., ...}, ... }
+    Dosya yoksa boş sözlük döner.
+    """
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_preset(
+    label: str,
+    config: Dict,
+    path: Union[str, Path] = DEFAULT_PRESETS_PATH
+) -> None:
+    """
+    Bir bandın en iyi konfigürasyonunu ön ayar dosyasına yazar (diğer bantlar korunur).
+    """
+    path = Path(path)
+    presets = load_presets(path)
+    presets[label] = config
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(presets, f, indent=2, ensure_ascii=False)
+
+def load_preset(n: int, path: Union[str, Path] = DEFAULT_PRESETS_PATH) -> Optional[Dict]:
+    """
+    n noktalık bir örnek için ayarlanmış ön ayarı döner; yoksa None.
+    """
+    label = band_label(n)
+    if label is None:
+        return None
+    return load_presets(path).get(label)
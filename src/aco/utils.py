@@ -3,10 +3,11 @@
 src/aco/utils.py
 
 ACO algoritması veya başka yerler için yardımcı fonksiyonlar içerir.
-Örnek: Haversine mesafesi hesaplama fonksiyonu.
+Örnek: Haversine mesafesi hesaplama fonksiyonları.
 """
 
 import math
+import numpy as np
 from typing import Tuple
 
 def haversine_distance(coord1: Tuple[float, float], coord2: Tuple[float, float]) -> float:
@@ -33,3 +34,25 @@ def haversine_distance(coord1: Tuple[float, float], coord2: Tuple[float, float])
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
 
     return R * c
+
+def haversine_matrix(coords: np.ndarray) -> np.ndarray:
+    """
+    Tüm nokta çiftleri için Haversine mesafe matrisini vektörel olarak hesaplar.
+    OSM grafiği gerektirmeyen durumlarda (ör. çevrimdışı parametre ayarı)
+    yol mesafesi yerine kullanılabilir.
+    Args:
+      - coords: (n x 2) [latitude, longitude] dizisi.
+    Returns:
+      - (n x n) mesafe matrisi (km), diyagonal 1e-10.
+    """
+    R = 6371.0  # Dünya yarıçapı (km)
+
+    rad = np.radians(np.asarray(coords, dtype=float).reshape(-1, 2))
+    lat = rad[:, 0][:, None]
+    lon = rad[:, 1][:, None]
+
+    a = np.sin((lat - lat.T) / 2.0) ** 2 + np.cos(lat) * np.cos(lat.T) * np.sin((lon - lon.T) / 2.0) ** 2
+    dist = 2 * R * np.arctan2(np.sqrt(a), np.sqrt(np.clip(1 - a, 0.0, None)))
+
+    np.fill_diagonal(dist, 1e-10)
+    return dist
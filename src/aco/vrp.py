@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+src/aco/vrp.py
+
+Kapasiteli çok araçlı rotalama (CVRP) modu:
+1. Duraklar Clarke-Wright tasarruf (savings) algoritmasıyla, araç
+   kapasitesini aşmayacak şekilde hızlıca rotalara bölünür.
+2. Her aracın rotası (depo + durakları) ayrı bir küçük TSP olarak ACO ile
+   bir süreç havuzunda eşzamanlı optimize edilir.
+3. Rotalar arası taşıma (relocate) ve değiş-tokuş (swap) hamleleriyle
+   toplam mesafe iyileştirilir.
+Tek büyük turu çözmek yerine çok sayıda küçük TSP çözüldüğü için süre,
+araç sayısıyla yaklaşık doğrusal artar.
+"""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from aco.algorithm import ACO
+from aco.kernels import init_pool_worker
+
+logger = logging.getLogger(__name__)
+
+# Bu kadar veya daha az durağı olan rotalar ACO'ya gönderilmez (sıra önemsiz)
+_TRIVIAL_STOPS = 2
+
+# İyileştirme kabul eşiği (km)
+_EPS = 1e-9
+
+def clarke_wright(
+    distance_matrix: np.ndarray,
+    demands: np.ndarray,
+    capacity: float,
+    depot: int = 0
+) -> List[List[int]]:
+    """
+    Clarke-Wright (paralel) tasarruf algoritmasıyla durakları rotalara böler.
+    Tasarruflar s(i, j) = d(depo, i) + d(depo, j) - d(i, j) vektörel olarak
+    hesaplanıp büyükten küçüğe işlenir.
+    Args:
+      - distance_matrix: (n x n) mesafe matrisi (depo dahil).
+      - demands: (n,) durak talepleri (depo talebi yok sayılır).
+      - capacity: Araç kapasitesi.
+      - depot: Depo indeksi.
+    Returns:
+      - Depoda başlayıp biten rotalar listesi ([depo, a, b, ..., depo]).
+    """
+    n = distance_matrix.shape[0]
+    demands = np.asarray(demands, dtype=float)
+    customers = np.array([i for i in range(n) if i != depot], dtype=np.int64)
+    if len(customers) == 0:
+        return []
+    if (demands[customers] > capacity).any():
+        raise ValueError("Bazı durakların talebi araç kapasitesini aşıyor.")
+
+    # Başlangıçta her durak için ayrı bir rota
+    routes: Dict[int, List[int]] = {int(c): [int(c)] for c in customers}
+    route_of = {int(c): int(c) for c in customers}
+    loads = {int(c): float(demands[c]) for c in customers}
+
+    i_idx, j_idx = np.triu_indices(len(customers), k=1)
+    ci = customers[i_idx]
+    cj = customers[j_idx]
+    savings = distance_matrix[depot, ci] + distance_matrix[depot, cj] - distance_matrix[ci, cj]
+    positive = savings > 0
+    ci, cj, savings = ci[positive], cj[positive], savings[positive]
+    order = np.argsort(-savings, kind="stable")
+
+    for a, b in zip(ci[order].tolist(), cj[order].tolist()):
+        ra, rb = route_of[a], route_of[b]
+        if ra == rb or loads[ra] + loads[rb] > capacity:
+            continue
+        route_a, route_b = routes[ra], routes[rb]
+
+        # Yalnızca rota uçlarındaki duraklar birleştirilebilir
+        if route_a[-1] == a and route_b[0] == b:
+            merged = route_a + route_b
+        elif route_a[0] == a and route_b[-1] == b:
+            merged = route_b + route_a
+        elif route_a[-1] == a and route_b[-1] == b:
+            merged = route_a + route_b[::-1]
+        elif route_a[0] == a and route_b[0] == b:
+            merged = route_a[::-1] + route_b
+        else:
+            continue
+
+        routes[ra] = merged
+        loads[ra] += loads.pop(rb)
+        del routes[rb]
+        for node in route_b:
+            route_of[node] = ra
+
+    return [[depot] + r + [depot] for r in routes.values()]
+
+def _optimise_route(task: Tuple[np.ndarray, np.ndarray, int, Dict]) -> List[int]:
+    """
+    Tek bir aracın rotasını ACO ile optimize eder ve depoda başlayıp biten
+    rotayı global indekslerle döner. Görev yalnızca rotanın alt matrisini taşır.
+    Args:
+      - task: (alt mesafe matrisi, rota düğümleri [depo, a, b, ...], iterasyon, ACO parametreleri)
+    """
+    sub_matrix, nodes, iterations, aco_params = task
+    depot = int(nodes[0])
+
+    aco = ACO(distance_matrix=sub_matrix, **aco_params)
+    tour, _, _ = aco.run(iterations=iterations)
+
+    # Turu depodan (yerel 0) başlayacak şekilde döndür
+    open_tour = tour[:-1]
+    k = open_tour.index(0)
+    local = open_tour[k:] + open_tour[:k]
+    return nodes[local].tolist() + [depot]
+
+def route_length(distance_matrix: np.ndarray, route: Sequence[int]) -> float:
+    """
+    Kapalı bir rotanın toplam uzunluğunu döner.
+    """
+    route = np.asarray(route, dtype=np.int64)
+    return float(distance_matrix[route[:-1], route[1:]].sum())
+
+def _exchange_pass(
+    distance_matrix: np.ndarray,
+    routes: List[List[int]],
+    demands: np.ndarray,
+    capacity: float
+) -> int:
+    """
+    Rotalar arası tek bir iyileştirme turu: her durak için en iyi taşıma
+    (başka rotaya en ucuz konuma ekleme) veya değiş-tokuş hamlesini arar.
+    Bir turda, birbirine dokunmayan rotalar üzerinde birden çok hamle uygulanır;
+    değişen rotalar bir sonraki tura kadar yeniden değerlendirilmez.
+    Returns:
+      - Uygulanan hamle sayısı.
+    """
+    d = distance_matrix
+    loads = np.array([demands[r[1:-1]].sum() for r in routes])
+    touched = np.zeros(len(routes), dtype=bool)
+
+    # Tüm rotaların kenarları (u -> v) ve durakların komşuları
+    edge_u = np.concatenate([r[:-1] for r in routes])
+    edge_v = np.concatenate([r[1:] for r in routes])
+    edge_route = np.concatenate([np.full(len(r) - 1, k) for k, r in enumerate(routes)])
+    edge_pos = np.concatenate([np.arange(1, len(r)) for r in routes])
+
+    stops = np.concatenate([r[1:-1] for r in routes])
+    stop_route = np.concatenate([np.full(len(r) - 2, k) for k, r in enumerate(routes)])
+    stop_pos = np.concatenate([np.arange(1, len(r) - 1) for r in routes])
+    stop_prev = np.concatenate([r[:-2] for r in routes])
+    stop_next = np.concatenate([r[2:] for r in routes])
+
+    moves = 0
+    for idx in range(len(stops)):
+        c, rc, pc = int(stops[idx]), int(stop_route[idx]), int(stop_pos[idx])
+        if touched[rc]:
+            continue
+        p, nx_ = int(stop_prev[idx]), int(stop_next[idx])
+        removal_gain = d[p, c] + d[c, nx_] - d[p, nx_]
+
+        # 1) Taşıma: c'yi başka bir rotadaki en ucuz kenarın arasına ekle
+        ok = (edge_route != rc) & ~touched[edge_route] & (loads[edge_route] + demands[c] <= capacity)
+        if ok.any():
+            insert_cost = np.where(ok, d[edge_u, c] + d[c, edge_v] - d[edge_u, edge_v], np.inf)
+            best = int(np.argmin(insert_cost))
+            if insert_cost[best] - removal_gain < -_EPS:
+                target = int(edge_route[best])
+                del routes[rc][pc]
+                routes[target].insert(int(edge_pos[best]), c)
+                touched[[rc, target]] = True
+                moves += 1
+                continue
+
+        # 2) Değiş-tokuş: c ile başka rotadaki e durağının yerini değiştir
+        other = (stop_route != rc) & ~touched[stop_route]
+        if not other.any():
+            continue
+        e = stops[other]
+        re_ = stop_route[other]
+        pe, ne = stop_prev[other], stop_next[other]
+        feasible = (
+            (loads[rc] - demands[c] + demands[e] <= capacity)
+            & (loads[re_] - demands[e] + demands[c] <= capacity)
+        )
+        delta = (
+            d[p, e] + d[e, nx_] - d[p, c] - d[c, nx_]
+            + d[pe, c] + d[c, ne] - d[pe, e] - d[e, ne]
+        )
+        delta = np.where(feasible, delta, np.inf)
+        best = int(np.argmin(delta))
+        if delta[best] < -_EPS:
+            target = int(re_[best])
+            routes[rc][pc], routes[target][int(stop_pos[other][best])] = int(e[best]), c
+            touched[[rc, target]] = True
+            moves += 1
+
+    # Boşalan rotaları (yalnızca depo) kaldır
+    routes[:] = [r for r in routes if len(r) > 2]
+    return moves
+
+def improve_routes(
+    distance_matrix: np.ndarray,
+    routes: List[List[int]],
+    demands: np.ndarray,
+    capacity: float,
+    max_passes: int = 50
+) -> List[List[int]]:
+    """
+    Rotalar arası taşıma/değiş-tokuş hamlelerini iyileşme kalmayana
+    (veya max_passes tura) kadar uygular.
+    """
+    routes = [list(r) for r in routes]
+    demands = np.asarray(demands, dtype=float)
+    total_moves = 0
+    for _ in range(max_passes):
+        if len(routes) < 2:
+            break
+        moves = _exchange_pass(distance_matrix, routes, demands, capacity)
+        if moves == 0:
+            break
+        total_moves += moves
+    if total_moves:
+        logger.info(f"Rotalar arası {total_moves} iyileştirme hamlesi uygulandı.")
+    return routes
+
+def solve_cvrp(
+    distance_matrix: np.ndarray,
+    demands: Sequence[float],
+    capacity: float,
+    depot: int = 0,
+    iterations: int = 100,
+    max_workers: Optional[int] = None,
+    max_passes: int = 50,
+    **aco_params
+) -> Tuple[List[List[int]], List[float], float]:
+    """
+    Kapasiteli çok araçlı rotalama problemini çözer.
+    Args:
+      - distance_matrix: (n x n) mesafe matrisi (depo dahil).
+      - demands: (n,) durak talepleri (depo talebi yok sayılır).
+      - capacity: Araç kapasitesi (talepler ile aynı birimde).
+      - depot: Depo indeksi.
+      - iterations: Her rota için ACO iterasyon sayısı.
+      - max_workers: Süreç havuzu boyutu (None = CPU sayısı).
+      - max_passes: Rotalar arası iyileştirme turu sınırı.
+      - aco_params: ACO yapıcısına geçilecek parametreler (alpha, beta, seed, ...).
+    Returns:
+      - routes: Her araç için depoda başlayıp biten rota listesi.
+      - lengths: Her rotanın uzunluğu (km).
+      - total: Toplam mesafe (km).
+    """
+    demands = np.asarray(demands, dtype=float).copy()
+    demands[depot] = 0.0
+
+    routes = clarke_wright(distance_matrix, demands, capacity, depot)
+    logger.info(f"Clarke-Wright: {len(routes)} araç rotası oluşturuldu.")
+
+    # Her rotayı ayrı tohumla, eşzamanlı optimize et
+    seed = aco_params.pop("seed", None)
+    large = [k for k, r in enumerate(routes) if len(r) - 2 > _TRIVIAL_STOPS]
+    tasks = []
+    for k in large:
+        nodes = np.asarray(routes[k][:-1], dtype=np.int64)  # nodes[0] = depo
+        params = dict(aco_params, seed=None if seed is None else seed + k)
+        tasks.append((distance_matrix[np.ix_(nodes, nodes)], nodes, iterations, params))
+
+    if len(tasks) == 1:
+        # Tek büyük rota için süreç havuzu başlatmaya değmez
+        routes[large[0]] = _optimise_route(tasks[0])
+    elif tasks:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=init_pool_worker) as pool:
+            for k, optimised in zip(large, pool.map(_optimise_route, tasks)):
+                routes[k] = optimised
+
+    routes = improve_routes(distance_matrix, routes, demands, capacity, max_passes=max_passes)
+    lengths = [route_length(distance_matrix, r) for r in routes]
+    return routes, lengths, float(sum(lengths))
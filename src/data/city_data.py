@@ -6,9 +6,10 @@ Varsayılan şehir listesini veya harici bir CSV dosyasından
 şehir verilerini yükleme fonksiyonları.
 """
 
-import pandas as pd
 from typing import Dict, Tuple
 
+from data.stop_loader import load_stops
+
 def load_default_cities() -> Dict[str, Tuple[float, float]]:
     """
     Türkiye'deki örnek şehirlerin koordinatlarını döner.
@@ -36,13 +37,8 @@ def load_cities_from_csv(
     """
     CSV dosyasından şehir listesini okur. Gerekli kolonlar: latitude, longitude, name.
     Format: { "ŞehirAdı": (latitude, longitude), ... }
+    Tekrar eden adlar sözlükte birleşir; büyük dosyalar ve aynı adlı duraklar
+    için dizi döndüren data.stop_loader.load_stops kullanılmalıdır.
     """
-    df = pd.read_csv(path)
-    required_cols = {lat_col, lon_col, name_col}
-    if not required_cols.issubset(df.columns):
-        raise ValueError(f"CSV dosyası şu kolonları içermeli: {required_cols}")
-
-    cities: Dict[str, Tuple[float, float]] = {}
-    for _, row in df.iterrows():
-        cities[row[name_col]] = (float(row[lat_col]), float(row[lon_col]))
-    return cities
+    stops = load_stops(path, lat_col=lat_col, lon_col=lon_col, name_col=name_col)
+    return dict(zip(stops.names, map(tuple, stops.coords.tolist())))
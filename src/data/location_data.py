@@ -6,9 +6,10 @@ Elâzığ içindeki teslimat/ticari noktaların genişletilmiş listesi ve
 CSV'den yükleme işlevleri.
 """
 
-import pandas as pd
 from typing import Dict, Tuple
 
+from data.stop_loader import load_stops
+
 def load_default_locations() -> Dict[str, Tuple[float, float]]:
     """
     Elâzığ içindeki yaygın olarak kullanılan 20+ noktanın (örneğin
@@ -49,13 +50,8 @@ def load_locations_from_csv(
     CSV dosyasından teslimat/ticari nokta listesini okur.
     Gerekli kolonlar: name, latitude, longitude.
     Format: { "YerAdı": (latitude, longitude), ... }
+    Tekrar eden adlar sözlükte birleşir; büyük dosyalar ve aynı adlı duraklar
+    için dizi döndüren data.stop_loader.load_stops kullanılmalıdır.
     """
-    df = pd.read_csv(path)
-    required_cols = {name_col, lat_col, lon_col}
-    if not required_cols.issubset(df.columns):
-        raise ValueError(f"CSV dosyası şu kolonları içermeli: {required_cols}")
-
-    locations: Dict[str, Tuple[float, float]] = {}
-    for _, row in df.iterrows():
-        locations[row[name_col]] = (float(row[lat_col]), float(row[lon_col]))
-    return locations
+    stops = load_stops(path, lat_col=lat_col, lon_col=lon_col, name_col=name_col)
+    return dict(zip(stops.names, map(tuple, stops.coords.tolist())))
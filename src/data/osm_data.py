@@ -2,85 +2,143 @@
 """
 src/data/osm_data.py
 
-Yerel olarak kaydedilmiş elazig_osm.graphml dosyasını yükler,
+Bölge kaydındaki (regions.json) yerel GraphML dosyalarını yükler,
 ağını projekte eder ve verilen koordinatlara göre
-mesafe matrisini (km) oluşturur.
+mesafe matrisini (km) ve istenirse her kaynak durağın Dijkstra öncül
+(predecessor) dizisini oluşturur.
 """
 
 import osmnx as ox
 import networkx as nx
 import numpy as np
 import streamlit as st
-from typing import List, Tuple
-from pathlib import Path
+from typing import List, Tuple, Union
+
+from data.regions import DEFAULT_REGION, GraphRegistry
+from data.route_geometry import PathGeometryCache
+
+# Bellekte tutulacak en fazla mesafe matrisi sonucu; öncül dizileri
+# (n x node sayısı) büyük olabildiği için düşük tutulur
+DISTANCE_CACHE_ENTRIES = 8
+
+# Koordinatlar: (n x 2) [latitude, longitude] numpy dizisi veya (lat, lon) listesi
+Coords = Union[np.ndarray, List[Tuple[float, float]]]
 
 @st.cache_resource(show_spinner=False)
-def load_osm_graph() -> nx.Graph:
+def get_graph_registry() -> GraphRegistry:
+    """
+    Oturumlar arasında paylaşılan bölge grafiği kaydını döner.
+    Grafikler bu kayıt içinde tembel yüklenir ve LRU ile bellekten atılır.
+    """
+    return GraphRegistry()
+
+def load_osm_graph(region: str = DEFAULT_REGION) -> nx.Graph:
     """
-    Elâzığ'ın OSM GraphML dosyasını yükler ve görüntüyü projekte eder.
+    Bölgenin OSM GraphML dosyasını (regions.json kaydına göre) yükler ve projekte eder.
     Dosya konumu, bu dosyanın bulunduğu klasöre göre dinamik olarak belirlenir.
+    Args:
+      - region: Bölge adı (varsayılan: Elâzığ).
     Returns:
       - Projected NetworkX Graph (kenar ağırlığı: "length").
     """
-    base_dir = Path(__file__).parent  # src/data klasörü
-    graphml_path = base_dir / "elazig_osm.graphml"
+    return get_graph_registry().get_graph(region)
 
-    if not graphml_path.exists():
-        raise FileNotFoundError(f"OSM GraphML bulunamadı: {graphml_path}")
+def region_for_coords(location_coords: Coords) -> str:
+    """
+    Durakların sınırlayıcı kutusuna göre kullanılacak bölgeyi seçer.
+    """
+    return get_graph_registry().region_for_coords(location_coords)
 
-    graph = ox.load_graphml(str(graphml_path))
-    graph_proj = ox.project_graph(graph)  # Projeksiyon yaparak KDTree bağımlılığı kaldırılır
-    return graph_proj
+@st.cache_resource(show_spinner=False)
+def get_path_geometry_cache() -> PathGeometryCache:
+    """
+    Oturumlar arasında paylaşılan yol geometrisi önbelleğini döner.
+    """
+    return PathGeometryCache()
+
+def snap_to_nodes(
+    graph_proj: nx.Graph,
+    location_coords: Coords
+) -> List[int]:
+    """
+    Tüm (lat, lon) noktalarını tek seferde grafiğin CRS'ine projekte eder ve
+    en yakın OSM node'larına oturtur (snap).
+    Args:
+      - graph_proj: load_osm_graph() tarafından dönen proje edilmiş grafik.
+      - location_coords: (n x 2) [latitude, longitude] dizisi veya listesi.
+    Returns:
+      - Her nokta için en yakın node kimliği listesi.
+    """
+    from pyproj import Transformer
+
+    coords = np.asarray(location_coords, dtype=float).reshape(-1, 2)
+    if len(coords) == 0:
+        return []
+
+    transformer = Transformer.from_crs("EPSG:4326", graph_proj.graph["crs"], always_xy=True)
+    xs, ys = transformer.transform(coords[:, 1], coords[:, 0])
+    nodes = ox.distance.nearest_nodes(graph_proj, X=np.asarray(xs), Y=np.asarray(ys))
+    return np.asarray(nodes).tolist()
 
-@st.cache_data(show_spinner=False)
+@st.cache_data(show_spinner=False, max_entries=DISTANCE_CACHE_ENTRIES)
 def compute_distance_matrix(
     _graph: nx.Graph,
-    location_coords: List[Tuple[float, float]]
-) -> np.ndarray:
+    location_coords: Coords,
+    keep_predecessors: bool = False,
+    region: str = DEFAULT_REGION
+) -> Union[np.ndarray, Tuple[np.ndarray, List[int], np.ndarray]]:
     """
     Proje edilmiş OSM grafiği üzerinden her koordinat çifti için
     en kısa yol mesafesini (kilometre cinsinden) hesaplar.
+    Her kaynak nokta için tek bir Dijkstra çalıştırılır; keep_predecessors
+    açıksa bu aramanın öncül ağacı, grafik node sırasına göre indekslenmiş
+    kompakt bir int32 satırı olarak saklanır. Çiftlerin node dizileri
+    burada kurulmaz; harita yalnızca çizilen ayakları bu satırlardan üretir.
     Args:
       - _graph: load_osm_graph() tarafından dönen proje edilmiş grafik.
-      - location_coords: [(latitude, longitude), ...] listesi.
+      - location_coords: (n x 2) [latitude, longitude] dizisi veya listesi.
+      - keep_predecessors: True ise öncül dizileri de döner.
+      - region: Grafiğin bölgesi; _graph önbellek anahtarına girmediği için
+        farklı bölgelerin sonuçlarını ayırmakta kullanılır.
     Returns:
       - (n x n) numpy.ndarray mesafe matrisi (km).
+      - keep_predecessors=True ise (mesafe matrisi, snap edilmiş node listesi,
+        (n x node sayısı) öncül dizisi) üçlüsü. predecessors[i, k], i. duraktan
+        başlayan en kısa yollarda k. node'dan önceki node'un sırasıdır (-1: yok).
     """
     graph_proj = _graph
 
-    # 1. Her (lat, lon) noktasını aynı CRS'e projekte et
-    from shapely.geometry import Point
-    projected_points = []
-    for lat, lon in location_coords:
-        geom = Point(lon, lat)
-        geom_proj = ox.projection.project_geometry(geom, to_crs=graph_proj.graph["crs"])[0]
-        projected_points.append((geom_proj.x, geom_proj.y))
+    # 1. Her noktayı en yakın node'a oturt
+    nodes = snap_to_nodes(graph_proj, location_coords)
 
-    n = len(projected_points)
+    n = len(nodes)
     dist_matrix = np.zeros((n, n), dtype=float)
+    predecessors = None
+    if keep_predecessors:
+        node_index = {nd: k for k, nd in enumerate(graph_proj.nodes)}
+        predecessors = np.full((n, len(node_index)), -1, dtype=np.int32)
 
-    # 2. Her proje edilmiş nokta için en yakın node'u bul
-    nodes = []
-    for x, y in projected_points:
-        node = ox.distance.nearest_nodes(graph_proj, X=x, Y=y)
-        nodes.append(node)
-
-    # 3. i<j çiftleri arasında en kısa yolu Dijkstra ile hesapla
+    # 2. Her kaynak için tek Dijkstra; i<j çiftleri doldurulup simetrik yapılır
     for i in range(n):
+        pred, dist = nx.dijkstra_predecessor_and_distance(
+            graph_proj,
+            source=nodes[i],
+            weight="length"
+        )
         for j in range(i + 1, n):
-            try:
-                length_m = nx.shortest_path_length(
-                    graph_proj,
-                    source=nodes[i],
-                    target=nodes[j],
-                    weight="length"
-                )
-                km = length_m / 1000.0
-            except (nx.NetworkXNoPath, nx.NodeNotFound):
-                km = float("inf")
+            length_m = dist.get(nodes[j])
+            km = float("inf") if length_m is None else length_m / 1000.0
             dist_matrix[i, j] = km
             dist_matrix[j, i] = km
 
-    # 4. Diyagonal değerleri (i,i) çok küçük yap (0 bölünme hatasını önlemek için)
+        if keep_predecessors:
+            reached = [(node_index[v], node_index[p[0]]) for v, p in pred.items() if p]
+            if reached:
+                targets, parents = np.array(reached, dtype=np.int64).T
+                predecessors[i, targets] = parents
+
+    # 3. Diyagonal değerleri (i,i) çok küçük yap (0 bölünme hatasını önlemek için)
     np.fill_diagonal(dist_matrix, 1e-10)
+    if keep_predecessors:
+        return dist_matrix, nodes, predecessors
     return dist_matrix
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+src/data/regions.py
+
+Birden fazla şehir (bölge) için OSM grafiklerini yöneten kayıt (registry):
+- regions.json, bölge adlarını önceden oluşturulmuş GraphML dosyalarına ve
+  sınırlayıcı kutularına (bounding box) eşler; generate_graphml.py ile güncellenir.
+- Durakların sınırlayıcı kutusuna göre uygun bölge otomatik seçilir; hiçbir
+  bölge durakları kapsamıyorsa yanlış grafikte çözmek yerine hata verilir.
+- Grafikler ilk istendiğinde yüklenir ve bellek sınırlı bir LRU'da tutulur;
+  sınır aşılırsa en uzun süredir kullanılmayan grafik bellekten atılır.
+  Yükleme bölge başına kilitlenir; diğer bölgelere erişim beklemez.
+"""
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import networkx as nx
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent  # src/data klasörü
+REGISTRY_PATH = DATA_DIR / "regions.json"
+
+# Varsayılan bölge (generate_graphml.py ve load_osm_graph için)
+DEFAULT_REGION = "elazig"
+
+# Kayıt dosyası yoksa da tanımlı olan bölgeler.
+# Elâzığ kutusu şehir merkezini kapsayan yaklaşık bir değerdir; generate_graphml.py
+# grafiği yeniden oluşturduğunda gerçek kutu regions.json kaydına yazılır.
+BUILTIN_REGIONS: Dict[str, Dict] = {
+    "elazig": {
+        "place": "Elâzığ, Turkey",
+        "graphml": "elazig_osm.graphml",
+        "bbox": [38.60, 39.10, 38.76, 39.35],
+    },
+}
+
+# Yüklü grafiklerin toplam bellek sınırı (yaklaşık)
+DEFAULT_MAX_BYTES = 1_500_000_000
+
+# Bellek tahmini için node/kenar başına kaba bayt değerleri (nitelikler dahil)
+_NODE_BYTES = 1_000
+_EDGE_BYTES = 1_500
+
+# (south, west, north, east)
+BBox = Tuple[float, float, float, float]
+
+def load_regions(path: Union[str, Path] = REGISTRY_PATH) -> Dict[str, Dict]:
+    """
+    Yerleşik bölgelerle kayıt dosyasındaki bölgeleri birleştirerek döner.
+    Format: { "bolge": {"place": ..., "graphml": ..., "bbox": [s, w, n, e]}, ... }
+    """
+    regions = {name: dict(info) for name, info in BUILTIN_REGIONS.items()}
+    path = Path(path)
+    if path.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            regions.update(json.load(f))
+    return regions
+
+def register_region(
+    name: str,
+    place: str,
+    graphml: str,
+    bbox: BBox,
+    path: Union[str, Path] = REGISTRY_PATH
+) -> None:
+    """
+    Bir bölgeyi kayıt dosyasına ekler veya günceller.
+    """
+    path = Path(path)
+    registry = {}
+    if path.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            registry = json.load(f)
+    registry[name] = {"place": place, "graphml": graphml, "bbox": list(bbox)}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(registry, f, indent=2, ensure_ascii=False)
+
+def graph_bbox(graph: nx.Graph) -> BBox:
+    """
+    Projekte edilmemiş grafiğin node'larından (south, west, north, east) kutusunu hesaplar.
+    """
+    ys = np.fromiter((d["y"] for _, d in graph.nodes(data=True)), dtype=float)
+    xs = np.fromiter((d["x"] for _, d in graph.nodes(data=True)), dtype=float)
+    return float(ys.min()), float(xs.min()), float(ys.max()), float(xs.max())
+
+def estimate_graph_bytes(graph: nx.Graph) -> int:
+    """
+    Grafiğin bellekte kapladığı alanı node ve kenar sayısından kabaca tahmin eder.
+    """
+    return graph.number_of_nodes() * _NODE_BYTES + graph.number_of_edges() * _EDGE_BYTES
+
+class GraphRegistry:
+    """
+    Bölge grafiklerini tembel (lazy) yükleyen, bellek sınırlı LRU kayıt.
+    Aynı grafiğin iki kez yüklenmemesi için yükleme bölge başına kilitlenir;
+    LRU sırası ve bellek toplamı ayrı, kısa süreli bir kilitle korunur.
+    """
+
+    def __init__(
+        self,
+        registry_path: Union[str, Path] = REGISTRY_PATH,
+        max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.registry_path = Path(registry_path)
+        self.max_bytes = max_bytes
+        self._graphs: "OrderedDict[str, Tuple[nx.Graph, int]]" = OrderedDict()
+        self._lock = threading.Lock()  # yalnızca LRU kayıt işlemleri için
+        self._loading: Dict[str, threading.Lock] = {}  # bölge başına yükleme kilidi
+
+    @property
+    def regions(self) -> Dict[str, Dict]:
+        return load_regions(self.registry_path)
+
+    def region_for_coords(self, coords) -> str:
+        """
+        Durakların sınırlayıcı kutusunu tamamen kapsayan en küçük bölgeyi döner.
+        Args:
+          - coords: (n x 2) [latitude, longitude] dizisi veya listesi.
+        Raises:
+          - ValueError: Durakları kapsayan kayıtlı bir bölge yoksa.
+        """
+        coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+        if len(coords) == 0:
+            return DEFAULT_REGION
+        lat_min, lon_min = coords.min(axis=0)
+        lat_max, lon_max = coords.max(axis=0)
+
+        best_name, best_area = None, float("inf")
+        for name, info in self.regions.items():
+            bbox = info.get("bbox")
+            if not bbox:
+                continue
+            south, west, north, east = bbox
+            if south <= lat_min and lat_max <= north and west <= lon_min and lon_max <= east:
+                area = (north - south) * (east - west)
+                if area < best_area:
+                    best_name, best_area = name, area
+        if best_name is None:
+            raise ValueError(
+                "Duraklar kayıtlı hiçbir bölgenin içinde değil "
+                f"(enlem {lat_min:.4f}–{lat_max:.4f}, boylam {lon_min:.4f}–{lon_max:.4f}). "
+                "Bölgeyi generate_graphml.py ile ekleyin."
+            )
+        return best_name
+
+    def loaded_regions(self) -> Dict[str, int]:
+        """
+        Bellekteki bölgeleri ve tahmini boyutlarını (bayt) LRU sırasıyla döner.
+        """
+        with self._lock:
+            return {name: size for name, (_, size) in self._graphs.items()}
+
+    def get_graph(self, region: str = DEFAULT_REGION) -> nx.Graph:
+        """
+        Bölgenin projekte edilmiş grafiğini döner; bellekte yoksa GraphML'den yükler.
+        Returns:
+          - Projected NetworkX Graph (kenar ağırlığı: "length").
+        """
+        graph_proj = self._cached(region)
+        if graph_proj is not None:
+            return graph_proj
+
+        with self._lock:
+            load_lock = self._loading.setdefault(region, threading.Lock())
+
+        # Grafik global kilit dışında yüklenir; aynı bölgeyi isteyenler bekler,
+        # diğer bölgelere (ve bellekteki grafiklere) erişim engellenmez.
+        with load_lock:
+            graph_proj = self._cached(region)
+            if graph_proj is not None:
+                return graph_proj
+
+            graph_proj = self._load(region)
+            size = estimate_graph_bytes(graph_proj)
+            logger.info(f"Bölge grafiği yüklendi: {region} (~{size / 1e6:.0f} MB)")
+
+            with self._lock:
+                self._graphs[region] = (graph_proj, size)
+                self._loading.pop(region, None)
+
+                # Sınır aşılıyorsa en eski grafikleri at (yeni yüklenen her zaman kalır)
+                total = sum(s for _, s in self._graphs.values())
+                while total > self.max_bytes and len(self._graphs) > 1:
+                    old_region, (_, old_size) = self._graphs.popitem(last=False)
+                    total -= old_size
+                    logger.info(f"Bölge grafiği bellekten atıldı: {old_region}")
+            return graph_proj
+
+    def _cached(self, region: str) -> Optional[nx.Graph]:
+        """
+        Bellekteki grafiği LRU sırasını güncelleyerek döner; yoksa None.
+        """
+        with self._lock:
+            cached = self._graphs.get(region)
+            if cached is None:
+                return None
+            self._graphs.move_to_end(region)
+            return cached[0]
+
+    def _load(self, region: str) -> nx.Graph:
+        """
+        Bölgenin GraphML dosyasını okuyup projekte eder (kilit tutulmadan çağrılır).
+        """
+        info = self.regions.get(region)
+        if info is None:
+            raise KeyError(f"Tanımsız bölge: {region}")
+        graphml_path = DATA_DIR / info["graphml"]
+        if not graphml_path.exists():
+            raise FileNotFoundError(f"OSM GraphML bulunamadı: {graphml_path}")
+
+        import osmnx as ox
+
+        graph = ox.load_graphml(str(graphml_path))
+        return ox.project_graph(graph)  # Projeksiyon yaparak KDTree bağımlılığı kaldırılır
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+src/data/route_geometry.py
+
+Snap edilmiş node çiftleri arasındaki gerçek yol geometrisini (lat, lon dizisi)
+önbellekte tutar ve harita için Douglas-Peucker ile sadeleştirir.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+import networkx as nx
+
+# Önbellekte tutulacak en fazla ayak (node çifti) sayısı
+DEFAULT_MAX_LEGS = 20_000
+
+# Web Mercator'da zoom 0 için ekvatordaki piksel başına metre değeri
+_METERS_PER_PIXEL_Z0 = 156543.03392
+
+def zoom_tolerance_m(zoom: int, latitude: float, pixels: float = 1.0) -> float:
+    """
+    Verilen zoom seviyesinde `pixels` kadar ekran mesafesinin
+    yerdeki karşılığını (metre) döner. Sadeleştirme toleransı olarak kullanılır.
+    """
+    return pixels * _METERS_PER_PIXEL_Z0 * math.cos(math.radians(latitude)) / (2 ** zoom)
+
+def douglas_peucker(points: np.ndarray, tolerance_m: float) -> np.ndarray:
+    """
+    (k x 2) boyutlu (lat, lon) dizisini Douglas-Peucker algoritması ile sadeleştirir.
+    Mesafeler, dizinin ortalama enlemi etrafında eşdikdörtgen (equirectangular)
+    yaklaşımla metreye çevrilerek hesaplanır.
+    Args:
+      - points: [(lat, lon), ...] numpy dizisi.
+      - tolerance_m: Korunacak en büyük sapma (metre).
+    Returns:
+      - Sadeleştirilmiş (m x 2) numpy dizisi (ilk ve son nokta her zaman korunur).
+    """
+    if len(points) <= 2 or tolerance_m <= 0:
+        return points
+
+    lat0 = math.radians(float(points[:, 0].mean()))
+    xy = np.column_stack((
+        np.radians(points[:, 1]) * math.cos(lat0),
+        np.radians(points[:, 0]),
+    )) * 6371000.0
+
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        seg = xy[end] - xy[start]
+        rel = xy[start + 1:end] - xy[start]
+        seg_len = math.hypot(seg[0], seg[1])
+        if seg_len == 0.0:
+            dists = np.hypot(rel[:, 0], rel[:, 1])
+        else:
+            dists = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / seg_len
+        idx = int(np.argmax(dists))
+        if dists[idx] > tolerance_m:
+            split = start + 1 + idx
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+
+    return points[keep]
+
+def path_from_predecessors(pred_row: np.ndarray, source: int, target: int) -> Optional[np.ndarray]:
+    """
+    compute_distance_matrix(keep_predecessors=True) öncül satırından
+    source -> target node sıralarını (grafik node sırasına göre) geri kurar.
+    Args:
+      - pred_row: Kaynak durağın öncül dizisi (-1: öncül yok).
+      - source/target: Başlangıç ve bitiş node'larının sırası.
+    Returns:
+      - Node sıralarını içeren dizi; hedefe ulaşılamıyorsa None.
+    """
+    path = [target]
+    while path[-1] != source:
+        parent = int(pred_row[path[-1]])
+        if parent < 0:
+            return None
+        path.append(parent)
+    path.reverse()
+    return np.asarray(path, dtype=np.int64)
+
+def node_latlon(graph: nx.Graph) -> np.ndarray:
+    """
+    Grafiğin node'larının (lat, lon) değerlerini node sırasına göre (N x 2) dizi olarak döner.
+    """
+    lat = np.fromiter((d["lat"] for _, d in graph.nodes(data=True)), dtype=float)
+    lon = np.fromiter((d["lon"] for _, d in graph.nodes(data=True)), dtype=float)
+    return np.column_stack((lat, lon))
+
+class PathGeometryCache:
+    """
+    Snap edilmiş (node_u, node_v) çiftine göre yol geometrisini saklar.
+    - Yalnızca haritada çizilen ayaklar, compute_distance_matrix(keep_predecessors=True)
+      öncül dizilerinden üretilip önbelleğe eklenir; ayrıca yol araması yapılmaz.
+    - Ayaklar yöne göre saklanır: yönlü (tek yönlü sokaklı) grafikte (v, u)
+      yolu, (u, v) yolunun tersi olmayabilir.
+    - Önbellek ayak sayısıyla sınırlı bir LRU'dur; get() de LRU sırasını
+      değiştirdiği için okuma ve yazma aynı kilitle yapılır.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAX_LEGS):
+        self.maxsize = maxsize
+        self._paths: "OrderedDict[Tuple[int, int], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def put(self, u: int, v: int, path: np.ndarray) -> None:
+        """
+        (u, v) çiftinin (lat, lon) dizisini ekler; sınır aşılırsa en eski ayak atılır.
+        """
+        with self._lock:
+            self._paths[(u, v)] = path
+            self._paths.move_to_end((u, v))
+            while len(self._paths) > self.maxsize:
+                self._paths.popitem(last=False)
+
+    def get(self, u: int, v: int) -> Optional[np.ndarray]:
+        """
+        Yalnızca u -> v yönündeki (lat, lon) dizisini döner; yoksa None.
+        """
+        if u == v:
+            return None
+        with self._lock:
+            path = self._paths.get((u, v))
+            if path is not None:
+                self._paths.move_to_end((u, v))
+            return path
+
+    def route_polyline(
+        self,
+        nodes: List[int],
+        route: List[int],
+        coords: np.ndarray,
+        zoom: int = 13,
+        graph: Optional[nx.Graph] = None,
+        predecessors: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Rota indekslerini takip eden, her ayağı zoom'a bağlı toleransla
+        sadeleştirilmiş tek bir (lat, lon) dizisi oluşturur.
+        Önbellekte olmayan ayaklar graph ve predecessors verildiyse öncül
+        dizilerinden üretilip önbelleğe eklenir; aksi halde iki durak arasında
+        düz çizgi kullanılır.
+        Args:
+          - nodes: Her durağın snap edildiği node kimlikleri.
+          - route: [0, 2, 1, 3, 0] gibi rota indeksleri.
+          - coords: Durakların (n x 2) [latitude, longitude] dizisi.
+          - zoom: Haritanın başlangıç zoom seviyesi.
+          - graph: Öncül dizilerinin hesaplandığı proje edilmiş grafik.
+          - predecessors: compute_distance_matrix(keep_predecessors=True) öncül dizisi.
+        Returns:
+          - (k x 2) numpy dizisi.
+        """
+        if not route:
+            return np.empty((0, 2), dtype=float)
+
+        coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+        tolerance = zoom_tolerance_m(zoom, float(coords[:, 0].mean()))
+
+        node_index = None
+        latlon = None
+
+        pieces = [coords[route[0]:route[0] + 1]]
+        for a, b in zip(route[:-1], route[1:]):
+            leg = self.get(nodes[a], nodes[b])
+            if leg is None and nodes[a] != nodes[b] and graph is not None and predecessors is not None:
+                if node_index is None:
+                    node_index = {nd: k for k, nd in enumerate(graph.nodes)}
+                    latlon = node_latlon(graph)
+                path = path_from_predecessors(predecessors[a], node_index[nodes[a]], node_index[nodes[b]])
+                if path is not None:
+                    leg = latlon[path]
+                    self.put(nodes[a], nodes[b], leg)
+            if leg is None:
+                pieces.append(coords[b:b + 1])
+                continue
+            leg = douglas_peucker(leg, tolerance)
+            # Durak -> yol başlangıcı, yol bitişi -> durak bağlantıları da çizilir
+            pieces.append(leg)
+            pieces.append(coords[b:b + 1])
+        return np.vstack(pieces)
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+src/data/stop_loader.py
+
+Büyük durak dosyalarını (CSV, Parquet, Arrow/Feather) hızlı ve az bellekle
+yükler:
+- Yalnızca gerekli kolonlar, açık veri tipleriyle okunur.
+- CSV parça parça (chunk), Parquet kayıt grubu (batch) bazında akış olarak işlenir.
+- Geçersiz koordinatlar ve aynı koordinata sahip tekrar eden duraklar
+  vektörel olarak elenir.
+- Sonuç, sözlük yerine (n x 2) float64 koordinat dizisi ve isim indeksidir;
+  elenen satır sayıları da raporlanır.
+"""
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional, Sequence
+
+# Parça başına okunacak satır sayısı
+DEFAULT_CHUNKSIZE = 100_000
+
+_PARQUET_SUFFIXES = {".parquet", ".pq"}
+_ARROW_SUFFIXES = {".arrow", ".feather", ".ipc"}
+
+class StopData(NamedTuple):
+    """
+    load_stops() sonucu.
+    """
+    coords: np.ndarray            # (n x 2) float64 [latitude, longitude]
+    names: pd.Index               # Her durağın adı (aynı adlar korunur)
+    demands: np.ndarray           # (n,) talepler; demand_col yoksa tümü 1
+    invalid_rows: int             # Geçersiz koordinat/talep nedeniyle elenen satır sayısı
+    duplicate_rows: int           # Aynı koordinattaki bir durakla birleştirilen satır sayısı
+
+def _suffix(path) -> str:
+    """
+    Dosya yolundan veya Streamlit UploadedFile nesnesinin adından uzantıyı döner.
+    """
+    name = getattr(path, "name", path)
+    return Path(str(name)).suffix.lower()
+
+def _iter_frames(
+    path,
+    columns: List[str],
+    chunksize: int,
+    optional: Sequence[str] = ()
+) -> Iterator[pd.DataFrame]:
+    """
+    Dosya biçimine göre yalnızca istenen kolonları içeren DataFrame parçaları üretir.
+    `optional` kolonlar dosyada varsa okunur, yoksa atlanır.
+    """
+    suffix = _suffix(path)
+    wanted = set(columns) | set(optional)
+
+    if suffix in _PARQUET_SUFFIXES:
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        names = parquet_file.schema_arrow.names
+        if not set(columns).issubset(names):
+            raise ValueError(f"Dosya şu kolonları içermeli: {set(columns)}")
+        read_cols = [c for c in names if c in wanted]
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=read_cols):
+            yield batch.to_pandas()
+        return
+
+    if suffix in _ARROW_SUFFIXES:
+        import pyarrow.feather as feather
+        import pyarrow.ipc as ipc
+
+        # Önce yalnızca şema okunur, ardından sadece istenen kolonlar alınır
+        names = ipc.open_file(path).schema.names
+        if not set(columns).issubset(names):
+            raise ValueError(f"Dosya şu kolonları içermeli: {set(columns)}")
+        if hasattr(path, "seek"):
+            path.seek(0)  # yüklenen dosya nesnesi şema okumasından sonra başa sarılır
+        # Bellek eşleme yalnızca diskteki dosyalarda etkilidir
+        table = feather.read_table(
+            path,
+            columns=[c for c in names if c in wanted],
+            memory_map=not hasattr(path, "read")
+        )
+        yield table.to_pandas()
+        return
+
+    reader = pd.read_csv(
+        path,
+        usecols=lambda c: c in wanted,
+        dtype={columns[0]: str},
+        chunksize=chunksize
+    )
+    with reader:
+        for chunk in reader:
+            if not set(columns).issubset(chunk.columns):
+                raise ValueError(f"CSV dosyası şu kolonları içermeli: {set(columns)}")
+            yield chunk
+
+def load_stops(
+    path,
+    lat_col: str = "latitude",
+    lon_col: str = "longitude",
+    name_col: str = "name",
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    decimals: int = 6,
+    demand_col: Optional[str] = None
+) -> StopData:
+    """
+    Durak dosyasını okur, doğrular ve tekrar eden koordinatları eler.
+    Args:
+      - path: Dosya yolu veya dosya benzeri nesne (.csv, .parquet, .arrow/.feather).
+      - lat_col/lon_col/name_col: Kolon adları.
+      - chunksize: Parça başına satır sayısı.
+      - decimals: Tekrar kontrolünde koordinatların yuvarlanacağı basamak sayısı.
+      - demand_col: Talep kolonu. Verilmezse, dosyada yoksa veya değer boşsa
+        talep 1 kabul edilir; negatif talepli satırlar elenir. Aynı koordinattaki
+        tekrar eden durakların talepleri toplanır.
+    Returns:
+      - StopData: koordinatlar, adlar, talepler ve elenen satır sayıları.
+    """
+    columns = [name_col, lat_col, lon_col]
+    optional = [demand_col] if demand_col else []
+    coord_parts: List[np.ndarray] = []
+    name_parts: List[np.ndarray] = []
+    demand_parts: List[np.ndarray] = []
+    total_rows = 0
+
+    for frame in _iter_frames(path, columns, chunksize, optional):
+        total_rows += len(frame)
+        # Koordinatlar float64'e to_numeric(errors="coerce") ile çevrilir: read_csv'ye
+        # dtype=float64 verilirse tek bir hatalı hücre tüm dosyayı reddettirir,
+        # böylece hatalı hücreler NaN olur ve aşağıda geçersiz satır olarak sayılır.
+        lat = pd.to_numeric(frame[lat_col], errors="coerce").to_numpy(dtype=np.float64)
+        lon = pd.to_numeric(frame[lon_col], errors="coerce").to_numpy(dtype=np.float64)
+        valid = (
+            np.isfinite(lat) & np.isfinite(lon)
+            & (np.abs(lat) <= 90.0) & (np.abs(lon) <= 180.0)
+        )
+        if demand_col and demand_col in frame.columns:
+            demand = pd.to_numeric(frame[demand_col], errors="coerce").to_numpy(dtype=np.float64)
+            demand = np.where(np.isnan(demand), 1.0, demand)
+            valid &= demand >= 0.0
+        else:
+            demand = np.ones(len(frame), dtype=np.float64)
+        demand_parts.append(demand[valid])
+        coord_parts.append(np.column_stack((lat[valid], lon[valid])))
+        name_parts.append(frame[name_col].astype(str).to_numpy(dtype=object)[valid])
+
+    coords = np.concatenate(coord_parts) if coord_parts else np.empty((0, 2), dtype=np.float64)
+    names = np.concatenate(name_parts) if name_parts else np.empty(0, dtype=object)
+    invalid_rows = total_rows - len(coords)
+    if len(coords) == 0:
+        return StopData(coords, pd.Index(names, dtype=object), np.empty(0, dtype=np.float64), invalid_rows, 0)
+
+    # Aynı koordinata düşen durakların ilki korunur (dosya sırası bozulmaz)
+    _, first, inverse = np.unique(
+        np.round(coords, decimals), axis=0, return_index=True, return_inverse=True
+    )
+    keep = np.sort(first)
+
+    # Tekrar eden durakların talepleri, korunan ilk durakta toplanır
+    group_demand = np.zeros(len(first), dtype=np.float64)
+    np.add.at(group_demand, inverse.ravel(), np.concatenate(demand_parts))
+    demands = group_demand[np.argsort(first)]
+
+    return StopData(
+        np.ascontiguousarray(coords[keep]),
+        pd.Index(names[keep]),
+        demands,
+        invalid_rows,
+        len(coords) - len(keep)
+    )
@@ -2,20 +2,37 @@
 """
 generate_graphml.py
 
-Elâzığ ilinin OSM yol ağını indirir ve
-src/data/elazig_osm.graphml dosyasına kaydeder.
+Verilen bölgenin (varsayılan: Elâzığ) OSM yol ağını indirir,
+src/data/<bölge>_osm.graphml dosyasına kaydeder ve bölgeyi
+sınırlayıcı kutusuyla birlikte src/data/regions.json kaydına ekler.
 
-Bu dosyayı yalnızca bir kez çalıştırın.
+Her bölge için yalnızca bir kez çalıştırın:
+    python src/generate_graphml.py
+    python src/generate_graphml.py --name malatya --place "Malatya, Turkey"
 """
 
+import argparse
+import os
+import sys
+
 import osmnx as ox
 from pathlib import Path
 
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from data.regions import DEFAULT_REGION, graph_bbox, register_region
+
 def main():
-    print("Başlatılıyor: Elâzığ OSM verisi indiriliyor...")
+    parser = argparse.ArgumentParser(description="Bir bölgenin OSM yol ağını GraphML olarak kaydeder.")
+    parser.add_argument("--name", default=DEFAULT_REGION, help="Bölge adı (kayıt anahtarı).")
+    parser.add_argument("--place", default="Elâzığ, Turkey", help="OSM'de aranacak yer adı.")
+    parser.add_argument("--network-type", default="drive", help="OSM ağ tipi.")
+    args = parser.parse_args()
 
-    place_name = "Elâzığ, Turkey"
-    network_type = "drive"
+    place_name = args.place
+    network_type = args.network_type
+
+    print(f"Başlatılıyor: {place_name} OSM verisi indiriliyor...")
 
     print(f"OSM'den '{place_name}' bölgesi yükleniyor...")
     graph = ox.graph_from_place(place_name, network_type=network_type)
@@ -23,14 +40,19 @@ def main():
     print("Ağ kenarlarına uzunluk (length) bilgisi ekleniyor...")
     ox.distance.add_edge_lengths(graph)
 
-    output_dir = Path("src/data")
+    output_dir = Path(__file__).parent / "data"
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    output_path = output_dir / "elazig_osm.graphml"
+    file_name = f"{args.name}_osm.graphml"
+    output_path = output_dir / file_name
     print(f"GraphML dosyası kaydediliyor: {output_path}")
     ox.save_graphml(graph, filepath=str(output_path))
 
-    print("Başarıyla kaydedildi: elazig_osm.graphml")
+    bbox = graph_bbox(graph)
+    register_region(args.name, place_name, file_name, bbox)
+    print(f"Bölge kaydedildi: {args.name} (kutu: {bbox})")
+
+    print(f"Başarıyla kaydedildi: {file_name}")
     print("generate_graphml.py işlemi tamamlandı.")
 
 if __name__ == "__main__":
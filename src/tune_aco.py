@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+tune_aco.py
+
+ACO parametrelerini, kayıtlı durak dosyalarımız (CSV/Parquet/Arrow) üzerinde
+F-race yöntemiyle paralel olarak ayarlar ve her örnek boyutu bandı için en iyi
+konfigürasyonu src/data/aco_presets.json dosyasına kaydeder.
+Uygulama bu ön ayarları otomatik olarak yükler.
+
+Örnek:
+    python src/tune_aco.py gunluk/*.csv --configs 40 --iterations 50 --repeats 3
+"""
+
+import argparse
+import logging
+import os
+import sys
+from collections import defaultdict
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from aco.tuning import (
+    DEFAULT_PRESETS_PATH,
+    band_label,
+    race,
+    sample_configurations,
+    save_preset,
+)
+from aco.utils import haversine_matrix
+from data.stop_loader import load_stops
+
+def build_matrix(coords, use_haversine: bool):
+    """
+    Durak koordinatları için mesafe matrisini hesaplar (OSM veya Haversine).
+    """
+    if use_haversine:
+        return haversine_matrix(coords)
+
+    from data.osm_data import load_osm_graph, compute_distance_matrix, region_for_coords
+    region = region_for_coords(coords)
+    return compute_distance_matrix(load_osm_graph(region), coords, region=region)
+
+def main():
+    parser = argparse.ArgumentParser(description="ACO parametrelerini F-race ile ayarlar.")
+    parser.add_argument("stop_files", nargs="+", help="Eğitim için durak dosyaları (CSV/Parquet/Arrow).")
+    parser.add_argument("--configs", type=int, default=40, help="Aday konfigürasyon sayısı.")
+    parser.add_argument("--iterations", type=int, default=50, help="Her çalıştırmadaki ACO iterasyon sayısı.")
+    parser.add_argument("--repeats", type=int, default=3, help="Her örneğin farklı tohumlarla tekrar sayısı.")
+    parser.add_argument("--min-blocks", type=int, default=5, help="İlk testten önceki blok sayısı.")
+    parser.add_argument("--workers", type=int, default=None, help="Süreç havuzu boyutu.")
+    parser.add_argument("--seed", type=int, default=42, help="Rastgele tohum.")
+    parser.add_argument("--haversine", action="store_true",
+                        help="OSM yol mesafesi yerine Haversine mesafesi kullan.")
+    parser.add_argument("--output", default=str(DEFAULT_PRESETS_PATH), help="Ön ayar dosyası.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    # ACO'nun iterasyon bazlı günlükleri yarış çıktısını boğmasın
+    logging.getLogger("aco.algorithm").setLevel(logging.WARNING)
+
+    print("Eğitim örnekleri yükleniyor...")
+    bands = defaultdict(list)
+    for path in args.stop_files:
+        coords = load_stops(path).coords
+        label = band_label(len(coords))
+        if label is None:
+            print(f"Atlandı (en az 2 nokta gerekli): {path}")
+            continue
+        try:
+            bands[label].append(build_matrix(coords, args.haversine))
+        except ValueError as e:  # duraklar kayıtlı hiçbir bölgede değil
+            print(f"Atlandı ({e}): {path}")
+            continue
+        print(f"  {path}: {len(coords)} nokta -> bant {label}")
+
+    configs = sample_configurations(args.configs, seed=args.seed)
+    for label, instances in sorted(bands.items()):
+        print(f"Bant {label}: {len(configs)} aday, {len(instances)} örnek yarıştırılıyor...")
+        best, survivors = race(
+            configs,
+            instances,
+            iterations=args.iterations,
+            repeats=args.repeats,
+            min_blocks=args.min_blocks,
+            max_workers=args.workers,
+            seed=args.seed
+        )
+        save_preset(label, best, args.output)
+        print(f"Bant {label}: en iyi {best} ({len(survivors)} aday elenmeden kaldı)")
+
+    print(f"tune_aco.py işlemi tamamlandı: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ Streamlit arayüzü:
   1) Varsayılan listedeki noktaları işaretlemek
   2) Haritaya tıklayarak yeni noktalar eklemek
 - ACO parametrelerini ayarlamak
+- İsteğe bağlı çok araçlı (CVRP) modda depo, talep ve araç kapasitesine göre
+  durakları araçlara bölmek
 - En uygun rotayı hesaplayıp harita ve grafiklerle sonuçları göstermek
 """
 
@@ -21,16 +23,28 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 # OSM verisini yükleyen ve mesafe matrisi oluşturan işlevler
-from data.osm_data import load_osm_graph, compute_distance_matrix
+from data.osm_data import (
+    load_osm_graph,
+    compute_distance_matrix,
+    get_path_geometry_cache,
+    region_for_coords,
+)
 
-# Ön tanımlı noktaları ve CSV’den gelen noktaları yükleyen işlevler
-from data.location_data import load_default_locations, load_locations_from_csv
+# Ön tanımlı noktaları ve dosyadan (CSV/Parquet/Arrow) gelen noktaları yükleyen işlevler
+from data.location_data import load_default_locations
+from data.stop_loader import load_stops
 
-# ACO algoritmasını içeren sınıf
-from aco.algorithm import ACO
+# ACO algoritmasını önbellek üzerinden çalıştıran işlevler
+from aco.cache import RouteCache, run_cached
+
+# Kapasiteli çok araçlı rotalama (CVRP)
+from aco.vrp import solve_cvrp
+
+# tune_aco.py ile üretilen, nokta sayısı bandına göre ayarlanmış parametreler
+from aco.tuning import DEFAULT_CONFIG, band_label, load_preset
 
 # Harita ve grafik görselleştirme işlevleri
-from ui.map_visualization import show_route_map
+from ui.map_visualization import show_fleet_map, show_route_map
 from ui.plots import plot_convergence, show_distance_matrix_heatmap
 
 # Harita üzerindeki tıklamaları almak için gerekli paketler
@@ -40,6 +54,12 @@ import folium
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Sonuç haritasının başlangıç zoom seviyesi (yol sadeleştirme toleransı da buna göre)
+MAP_ZOOM = 13
+
+# Çözülmüş rotaların diskte saklandığı klasör
+ROUTE_CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data", "route_cache"))
+
 
 def initialize_session():
     """
@@ -47,12 +67,47 @@ def initialize_session():
     """
     if "results" not in st.session_state:
         st.session_state.results = None
-    if "selected_locations" not in st.session_state:
-        st.session_state.selected_locations = {}
+    if "selected_names" not in st.session_state:
+        set_selection([], [])
     if "clicked_points" not in st.session_state:
         st.session_state.clicked_points = []
 
 
+@st.cache_resource(show_spinner=False)
+def get_route_cache():
+    """
+    Oturumlar arasında paylaşılan, diske de yazılan rota sonuç önbelleğini döner.
+    """
+    return RouteCache(maxsize=64, cache_dir=ROUTE_CACHE_DIR)
+
+
+def set_selection(names, coords, demands=None):
+    """
+    Seçilen durakları oturumda ad listesi, (n x 2) koordinat dizisi ve
+    talep dizisi olarak saklar. Talep verilmezse her durağın talebi 1'dir.
+    """
+    st.session_state.selected_names = list(names)
+    st.session_state.selected_coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+    if demands is None:
+        demands = np.ones(len(st.session_state.selected_names))
+    st.session_state.selected_demands = np.asarray(demands, dtype=float)
+
+
+@st.cache_data(show_spinner=False)
+def load_uploaded_stops(uploaded_file):
+    """
+    Yüklenen dosyadaki durakları ve (varsa) taleplerini okur; aynı dosya için
+    yeniden okuma yapılmaz.
+    """
+    return load_stops(
+        uploaded_file,
+        lat_col="latitude",
+        lon_col="longitude",
+        name_col="name",
+        demand_col="demand"
+    )
+
+
 def main():
     # Sayfa başlığı ve yerleşim ayarları
     st.set_page_config(page_title="Elâzığ Teslimat Rotası Optimizasyonu", layout="wide")
@@ -97,25 +152,33 @@ def main():
                         selected[name] = coord
                 if len(selected) < 2:
                     st.info("Lütfen en az 2 nokta seçin.")
-                st.session_state.selected_locations = selected
+                set_selection(selected.keys(), list(selected.values()))
 
             # CSV dosyası yükleme bölümü
             else:
-                st.write("CSV dosyası yükleyin. Gerekli kolonlar: name, latitude, longitude")
-                uploaded_file = st.file_uploader("CSV Dosyası Seç", type=["csv"])
+                st.write(
+                    "CSV, Parquet veya Arrow dosyası yükleyin. "
+                    "Gerekli kolonlar: name, latitude, longitude "
+                    "(çok araçlı mod için opsiyonel: demand)"
+                )
+                uploaded_file = st.file_uploader(
+                    "Dosya Seç", type=["csv", "parquet", "pq", "arrow", "feather"]
+                )
                 if uploaded_file is not None:
                     try:
-                        locs_from_csv = load_locations_from_csv(
-                            path=uploaded_file,
-                            lat_col="latitude",
-                            lon_col="longitude",
-                            name_col="name"
-                        )
-                        st.success(f"{len(locs_from_csv)} nokta yüklendi.")
-                        st.session_state.selected_locations = locs_from_csv
+                        stops = load_uploaded_stops(uploaded_file)
+                        st.success(f"{len(stops.names)} nokta yüklendi.")
+                        # Elenen veya birleştirilen satırlar kullanıcıya bildirilir
+                        if stops.invalid_rows:
+                            st.warning(f"{stops.invalid_rows} satır geçersiz koordinat/talep nedeniyle atlandı.")
+                        if stops.duplicate_rows:
+                            st.warning(
+                                f"{stops.duplicate_rows} satır, aynı koordinattaki bir durakla birleştirildi."
+                            )
+                        set_selection(stops.names, stops.coords, stops.demands)
                     except Exception as e:
-                        st.error(f"CSV yüklenirken hata: {e}")
-                        st.session_state.selected_locations = {}
+                        st.error(f"Dosya yüklenirken hata: {e}")
+                        set_selection([], [])
 
         # ----- Haritadan Tıklayarak Nokta Seçim Bölümü ----- #
         else:
@@ -124,7 +187,7 @@ def main():
             # “Noktaları Temizle” düğmesi: Tüm tıklamaları sıfırlar
             if st.button("Noktaları Temizle"):
                 st.session_state.clicked_points = []
-                st.session_state.selected_locations = {}
+                set_selection([], [])
 
             # Folium haritasını ayarlayalım (Elâzığ merkezine yakın bir konum)
             center = (38.6744, 39.2220)
@@ -150,85 +213,173 @@ def main():
                 for idx, (lat, lon) in enumerate(st.session_state.clicked_points):
                     st.write(f"{idx+1}. ({lat:.4f}, {lon:.4f})")
 
-            # En az 2 nokta seçildiyse, bunları sözlüğe dönüştür
+            # En az 2 nokta seçildiyse, bunları seçim olarak kaydet
             if len(st.session_state.clicked_points) >= 2:
-                selected = {
-                    f"Nokta {i+1}": coords
-                    for i, coords in enumerate(st.session_state.clicked_points)
-                }
-                st.session_state.selected_locations = selected
+                set_selection(
+                    [f"Nokta {i+1}" for i in range(len(st.session_state.clicked_points))],
+                    st.session_state.clicked_points
+                )
             else:
-                st.session_state.selected_locations = {}
+                set_selection([], [])
 
         st.markdown("---")
         st.header("2. ACO Parametreleri")
 
         # Seçilmiş nokta sayısı yetersizse butonu devre dışı bırak
-        if len(st.session_state.selected_locations) < 2:
+        if len(st.session_state.selected_names) < 2:
             st.warning("En az 2 nokta seçmelisiniz.")
             st.button("Optimizasyonu Başlat", disabled=True)
             return
 
+        # Nokta sayısının bandı için ayarlanmış ön ayar varsa varsayılanlar ondan gelir
+        defaults = dict(DEFAULT_CONFIG)
+        preset = load_preset(len(st.session_state.selected_names))
+        if preset:
+            defaults.update(preset)
+            st.caption(f"Ayarlanmış ön ayar yüklendi ({band_label(len(st.session_state.selected_names))} nokta).")
+
         # ACO algoritması için temel parametreler
-        ant_count = st.number_input("Karınca Sayısı", min_value=2, max_value=100, value=20, step=1)
+        ant_count = st.number_input("Karınca Sayısı", min_value=2, max_value=100, value=int(defaults["ant_count"]), step=1)
         iterations = st.number_input("Iterasyon Sayısı", min_value=10, max_value=1000, value=100, step=10)
         seed = st.number_input("Rastgele Tohum", min_value=0, max_value=999999, value=42, step=1)
 
         # Gelişmiş parametreler gizlenebilir bir bölümde
         with st.expander("Gelişmiş Ayarlar"):
-            alpha = st.slider("Alpha (Feromon Etkisi)", min_value=0.1, max_value=5.0, value=1.0, step=0.1)
-            beta = st.slider("Beta (Mesafe Etkisi)", min_value=0.1, max_value=5.0, value=3.0, step=0.1)
-            rho = st.slider("Rho (Feromon Buharlaşma)", min_value=0.01, max_value=1.0, value=0.3, step=0.01)
-            Q = st.number_input("Q (Feromon Sabiti)", min_value=1, max_value=500, value=100, step=1)
+            alpha = st.slider("Alpha (Feromon Etkisi)", min_value=0.1, max_value=5.0, value=float(defaults["alpha"]), step=0.1)
+            beta = st.slider("Beta (Mesafe Etkisi)", min_value=0.1, max_value=5.0, value=float(defaults["beta"]), step=0.1)
+            rho = st.slider("Rho (Feromon Buharlaşma)", min_value=0.01, max_value=1.0, value=float(defaults["rho"]), step=0.01)
+            Q = st.number_input("Q (Feromon Sabiti)", min_value=1, max_value=500, value=int(defaults["Q"]), step=1)
+
+        # Çok araçlı mod: depo seçilir, duraklar kapasiteye göre araçlara bölünür
+        st.markdown("---")
+        st.header("3. Çok Araçlı Mod (CVRP)")
+        fleet_mode = st.checkbox("Birden fazla araç kullan")
+        depot = 0
+        capacity = None
+        if fleet_mode:
+            depot = st.selectbox(
+                "Depo",
+                range(len(st.session_state.selected_names)),
+                format_func=lambda i: st.session_state.selected_names[i]
+            )
+            max_demand = float(st.session_state.selected_demands.max())
+            capacity = st.number_input(
+                "Araç Kapasitesi",
+                min_value=max(max_demand, 1.0),
+                value=max(max_demand, 10.0),
+                step=1.0
+            )
+            st.caption(f"Toplam talep: {st.session_state.selected_demands.sum():.0f}")
 
         st.markdown("---")
         run_button = st.button("Optimizasyonu Başlat")
 
     # ====== Hesaplama ve Sonuçları Gösterme Bölümü ====== #
     if run_button:
-        selected = st.session_state.selected_locations
-        loc_names = list(selected.keys())
-        loc_coords = list(selected.values())
+        loc_names = st.session_state.selected_names
+        loc_coords = st.session_state.selected_coords
 
         try:
             # OSM grafiğini yükleyip proje edilmiş haliyle mesafe matrisi oluşturuyoruz
-            with st.spinner("OSM verisi yükleniyor..."):
-                graph = load_osm_graph()
+            # Durakların bulunduğu bölge otomatik seçilir; grafiği ilk kullanımda yüklenir
+            region = region_for_coords(loc_coords)
+            with st.spinner(f"OSM verisi yükleniyor ({region})..."):
+                graph = load_osm_graph(region)
             with st.spinner("Mesafe matrisi hesaplanıyor..."):
-                dist_matrix = compute_distance_matrix(graph, loc_coords)
-        except FileNotFoundError as e:
+                dist_matrix, snapped_nodes, predecessors = compute_distance_matrix(
+                    graph, loc_coords, keep_predecessors=True, region=region
+                )
+            geometry_cache = get_path_geometry_cache()
+        except (FileNotFoundError, ValueError) as e:
+            # GraphML eksik veya duraklar kayıtlı hiçbir bölgede değil
             st.error(f"Hata: {e}")
             st.stop()
 
         st.success("Mesafe matrisi başarıyla oluşturuldu.")
         st.info("ACO algoritması çalıştırılıyor...")
 
-        # ACO algoritmasını çalıştır
-        aco = ACO(
-            distance_matrix=dist_matrix,
-            ant_count=ant_count,
-            alpha=alpha,
-            beta=beta,
-            rho=rho,
-            Q=Q,
-            seed=seed
-        )
-        best_route, best_distance, history = aco.run(iterations=iterations)
-
-        st.session_state.results = {
-            "loc_names": loc_names,
-            "distance_matrix": dist_matrix,
-            "best_route": best_route,
-            "best_distance": best_distance,
-            "history": history
+        aco_params = {
+            "ant_count": ant_count,
+            "alpha": alpha,
+            "beta": beta,
+            "rho": rho,
+            "Q": Q,
+            "seed": seed
         }
 
-        st.success(f"Optimizasyon tamamlandı! En kısa mesafe: {best_distance:.2f} km")
+        if fleet_mode:
+            # Duraklar araçlara bölünür, her aracın rotası paralel optimize edilir
+            with st.spinner("Araç rotaları optimize ediliyor..."):
+                routes, route_lengths, total_distance = solve_cvrp(
+                    dist_matrix,
+                    st.session_state.selected_demands,
+                    capacity,
+                    depot=depot,
+                    iterations=iterations,
+                    **aco_params
+                )
+            route_geometries = [
+                geometry_cache.route_polyline(
+                    snapped_nodes, r, loc_coords, zoom=MAP_ZOOM, graph=graph, predecessors=predecessors
+                )
+                for r in routes
+            ]
+            st.session_state.results = {
+                "loc_names": loc_names,
+                "loc_coords": loc_coords,
+                "distance_matrix": dist_matrix,
+                "routes": routes,
+                "route_lengths": route_lengths,
+                "route_geometries": route_geometries,
+                "demands": st.session_state.selected_demands,
+                "best_distance": total_distance
+            }
+            st.success(
+                f"Optimizasyon tamamlandı! {len(routes)} araç, "
+                f"toplam mesafe: {total_distance:.2f} km"
+            )
+        else:
+            # ACO algoritmasını önbellek üzerinden çalıştır
+            route_cache = get_route_cache()
+            cache_key = route_cache.make_key(snapped_nodes, f"osm:{region}", aco_params)
+            best_route, best_distance, history, cache_status = run_cached(
+                route_cache,
+                cache_key,
+                dist_matrix,
+                iterations,
+                **aco_params
+            )
+            if cache_status == "hit":
+                st.info("Bu duraklar ve parametreler için önbellekteki sonuç kullanıldı.")
+            elif cache_status == "resume":
+                st.info("Önbellekteki çözüm kaldığı yerden devam ettirildi.")
+
+            # Rotanın gerçek yol geometrisi (önbellekten veya öncül dizilerinden, ek yol araması olmadan)
+            route_geometry = geometry_cache.route_polyline(
+                snapped_nodes, best_route, loc_coords, zoom=MAP_ZOOM, graph=graph, predecessors=predecessors
+            )
+
+            st.session_state.results = {
+                "loc_names": loc_names,
+                "loc_coords": loc_coords,
+                "distance_matrix": dist_matrix,
+                "route_geometry": route_geometry,
+                "best_route": best_route,
+                "best_distance": best_distance,
+                "history": history
+            }
+
+            st.success(f"Optimizasyon tamamlandı! En kısa mesafe: {best_distance:.2f} km")
+
+    # Çok araçlı sonuç varsa araç bazında göster
+    if st.session_state.results is not None and "routes" in st.session_state.results:
+        show_fleet_results(st.session_state.results)
 
     # Eğer sonuç varsa, üç sekmede göster
-    if st.session_state.results is not None:
+    elif st.session_state.results is not None:
         data = st.session_state.results
         loc_names = data["loc_names"]
+        loc_coords = data["loc_coords"]
         dist_mat = data["distance_matrix"]
         best_route = data["best_route"]
         best_dist = data["best_distance"]
@@ -241,12 +392,14 @@ def main():
         tab1, tab2, tab3 = st.tabs(["Harita", "Konverjans Grafiği", "Detaylar"])
         with tab1:
             st.subheader("Optimum Rota Haritası")
-            ordered_locs = {name: st.session_state.selected_locations[name] for name in loc_names}
             show_route_map(
-                ordered_locs,
+                loc_names,
+                loc_coords,
                 best_route,
                 map_width=1000,
-                map_height=600
+                map_height=600,
+                route_geometry=data["route_geometry"],
+                zoom_start=MAP_ZOOM
             )
 
         # Sekme 2: Konverjans Grafiği ve Mesafe Matrisi Isı Haritası
@@ -254,23 +407,22 @@ def main():
             st.subheader("ACO Konverjans Grafiği")
             plot_convergence(history)
             with st.expander("Mesafe Matrisi Isı Haritası"):
-                show_distance_matrix_heatmap(dist_mat, loc_names)
+                show_distance_matrix_heatmap(dist_mat, loc_names, route=best_route)
 
         # Sekme 3: Detay Tablosu
         with tab3:
             st.subheader("Rota Detayları")
-            order = best_route[:-1]
+            # Tablo NumPy indekslemesiyle tek seferde oluşturulur
+            order = np.asarray(best_route[:-1], dtype=int)
+            next_stop = np.roll(order, -1)
             df = pd.DataFrame({
-                "Sıra": list(range(1, len(order) + 1)),
-                "Nokta": [loc_names[i] for i in order],
-                "Enlem": [st.session_state.selected_locations[loc_names[i]][0] for i in order],
-                "Boylam": [st.session_state.selected_locations[loc_names[i]][1] for i in order],
-                "Bir Sonraki Noktaya Mesafe (km)": [
-                    dist_mat[order[i], order[i + 1]] for i in range(len(order) - 1)
-                ] + [dist_mat[order[-1], order[0]]]
+                "Sıra": np.arange(1, len(order) + 1),
+                "Nokta": np.asarray(loc_names, dtype=object)[order],
+                "Enlem": loc_coords[order, 0],
+                "Boylam": loc_coords[order, 1],
+                # Mesafe sütununu biçimlendir
+                "Bir Sonraki Noktaya Mesafe (km)": np.char.mod("%.2f", dist_mat[order, next_stop])
             })
-            # Mesafe sütununu biçimlendir
-            df["Bir Sonraki Noktaya Mesafe (km)"] = df["Bir Sonraki Noktaya Mesafe (km)"].map(lambda x: f"{x:.2f}")
             st.dataframe(df, width=800)
 
             full_route = " → ".join([loc_names[i] for i in best_route])
@@ -287,5 +439,74 @@ def main():
             )
 
 
+def show_fleet_results(data):
+    """
+    Çok araçlı (CVRP) çözümü harita, araç özeti ve detay tablosu sekmelerinde gösterir.
+    """
+    loc_names = data["loc_names"]
+    loc_coords = data["loc_coords"]
+    dist_mat = data["distance_matrix"]
+    routes = data["routes"]
+    route_lengths = data["route_lengths"]
+
+    st.markdown("---")
+    st.header("Sonuçlar")
+
+    tab1, tab2, tab3 = st.tabs(["Harita", "Araç Özeti", "Detaylar"])
+    with tab1:
+        st.subheader("Araç Rotaları Haritası")
+        show_fleet_map(
+            loc_names,
+            loc_coords,
+            routes,
+            map_width=1000,
+            map_height=600,
+            route_geometries=data["route_geometries"],
+            zoom_start=MAP_ZOOM
+        )
+
+    with tab2:
+        st.subheader("Araç Özeti")
+        demands = data["demands"]
+        summary = pd.DataFrame({
+            "Araç": np.arange(1, len(routes) + 1),
+            "Durak Sayısı": [len(r) - 2 for r in routes],
+            "Yük": [demands[r[1:-1]].sum() for r in routes],
+            "Mesafe (km)": np.round(route_lengths, 2)
+        })
+        st.dataframe(summary, width=800)
+        with st.expander("Mesafe Matrisi Isı Haritası"):
+            # Araç rotaları art arda eklenerek sıralanır (depo bir kez)
+            order = [routes[0][0]] + [i for r in routes for i in r[1:-1]] if routes else []
+            show_distance_matrix_heatmap(dist_mat, loc_names, route=order + order[:1])
+
+    with tab3:
+        st.subheader("Rota Detayları")
+        # Her aracın ayakları tek seferde NumPy indekslemesiyle birleştirilir
+        starts = np.concatenate([np.asarray(r[:-1], dtype=int) for r in routes])
+        ends = np.concatenate([np.asarray(r[1:], dtype=int) for r in routes])
+        vehicle = np.concatenate([np.full(len(r) - 1, k + 1) for k, r in enumerate(routes)])
+        position = np.concatenate([np.arange(1, len(r)) for r in routes])
+        df = pd.DataFrame({
+            "Araç": vehicle,
+            "Sıra": position,
+            "Nokta": np.asarray(loc_names, dtype=object)[starts],
+            "Enlem": loc_coords[starts, 0],
+            "Boylam": loc_coords[starts, 1],
+            "Bir Sonraki Noktaya Mesafe (km)": np.char.mod("%.2f", dist_mat[starts, ends])
+        })
+        st.dataframe(df, width=800)
+        st.markdown(f"**Araç Sayısı:** {len(routes)}")
+        st.markdown(f"**Toplam Mesafe:** **{data['best_distance']:.2f} km**")
+
+        csv_data = df.to_csv(index=False).encode("utf-8")
+        st.download_button(
+            label="Rotaları CSV Olarak İndir",
+            data=csv_data,
+            file_name="optimized_fleet_routes.csv",
+            mime="text/csv"
+        )
+
+
 if __name__ == "__main__":
     main()
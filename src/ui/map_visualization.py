@@ -3,38 +3,175 @@
 src/ui/map_visualization.py
 
 Folium kullanarak optimize edilmiş rotayı harita üzerinde gösterir.
+Durak sayısı HIGH_VOLUME_THRESHOLD değerini aştığında, binlerce durağı
+tarayıcıyı kilitlemeden çizebilmek için yüksek hacim moduna geçilir:
+- Duraklar tek bir FastMarkerCluster katmanında, kümelenerek çizilir.
+- Popup içerikleri yalnızca tıklandığında (tarayıcıda) üretilir.
+- Rota, sıkıştırılmış "encoded polyline" metni olarak gönderilir.
+Çok araçlı (CVRP) çözümler show_fleet_map ile araç başına ayrı renkte çizilir.
 """
 
 import folium
 import numpy as np
+from branca.element import MacroElement, Template
+from folium.plugins import FastMarkerCluster
 from streamlit_folium import st_folium
-from typing import Dict, Tuple, List
+from typing import List, Optional, Sequence
 
-def show_route_map(
-    locations: Dict[str, Tuple[float, float]],
-    route: List[int],
-    map_width: int = 800,
-    map_height: int = 500
-) -> None:
+# Bu sayının üzerindeki durak kümeleri yüksek hacim modunda çizilir
+HIGH_VOLUME_THRESHOLD = 500
+
+# Yüksek hacim modunda her durak için tarayıcıda çalışan işaretçi fonksiyonu.
+# row = [lat, lon, ad, sıra]; sıra 0 ise durak rota dışıdır.
+_CLUSTER_CALLBACK = """
+(function (row) {
+    var order = row[3];
+    var color = order === 1 ? "darkgreen" : (order > 0 ? "blue" : "gray");
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: 5, color: color, fillColor: color, fillOpacity: 0.8, weight: 1
+    });
+    marker.bindPopup(function () {
+        var div = document.createElement("div");
+        var b = document.createElement("b");
+        b.textContent = row[2];
+        div.appendChild(b);
+        div.appendChild(document.createElement("br"));
+        div.appendChild(document.createTextNode(
+            order > 0 ? "Öncelik: " + order : "(Rota Dışı)"
+        ));
+        return div;
+    });
+    return marker;
+})
+"""
+
+# Çok araçlı modda araç rotalarının renkleri (sırayla tekrar eder)
+VEHICLE_COLORS = [
+    "red", "blue", "green", "purple", "orange", "darkred",
+    "cadetblue", "darkgreen", "darkblue", "pink", "gray", "black",
+]
+
+# Çok araçlı yüksek hacim modunda işaretçi fonksiyonu.
+# row = [lat, lon, ad, araç (1'den başlar), sıra, renk]
+_FLEET_CLUSTER_CALLBACK = """
+(function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: 5, color: row[5], fillColor: row[5], fillOpacity: 0.8, weight: 1
+    });
+    marker.bindPopup(function () {
+        var div = document.createElement("div");
+        var b = document.createElement("b");
+        b.textContent = row[2];
+        div.appendChild(b);
+        div.appendChild(document.createElement("br"));
+        div.appendChild(document.createTextNode("Araç " + row[3] + ", Sıra: " + row[4]));
+        return div;
+    });
+    return marker;
+})
+"""
+
+
+class _EncodedPolyLine(MacroElement):
     """
-    Teslimat noktalarını ve en iyi rotayı Folium haritasında çizer.
+    Google "encoded polyline" (hassasiyet 1e-5) metnini tarayıcıda çözüp
+    Leaflet polyline olarak haritaya ekler. Koordinat listesine göre
+    sayfa boyutunu kabaca 4-5 kat küçültür.
+    """
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function () {
+            var encoded = {{ this.encoded|tojson }};
+            var coords = [], index = 0, lat = 0, lng = 0;
+            while (index < encoded.length) {
+                var b, shift = 0, result = 0;
+                do {
+                    b = encoded.charCodeAt(index++) - 63;
+                    result |= (b & 0x1f) << shift;
+                    shift += 5;
+                } while (b >= 0x20);
+                lat += (result & 1) ? ~(result >> 1) : (result >> 1);
+                shift = 0;
+                result = 0;
+                do {
+                    b = encoded.charCodeAt(index++) - 63;
+                    result |= (b & 0x1f) << shift;
+                    shift += 5;
+                } while (b >= 0x20);
+                lng += (result & 1) ? ~(result >> 1) : (result >> 1);
+                coords.push([lat * 1e-5, lng * 1e-5]);
+            }
+            L.polyline(coords, {{ this.options|tojson }}).addTo({{ this._parent.get_name() }});
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, encoded: str, **options):
+        super().__init__()
+        self._name = "EncodedPolyLine"
+        self.encoded = encoded
+        self.options = options
+
+
+def encode_polyline(points: np.ndarray) -> str:
+    """
+    (k x 2) boyutlu (lat, lon) dizisini Google encoded polyline formatına çevirir.
     Args:
-      - locations: { "YerAdı": (latitude, longitude), ... }
-      - route: [0, 2, 1, 3, 0] gibi indekslerden oluşan rota listesi.
-      - map_width/map_height: Harita boyutları (Streamlit görünümü için).
+      - points: [(lat, lon), ...] numpy dizisi.
+    Returns:
+      - Kodlanmış metin.
     """
-    location_names = list(locations.keys())
-    coords = list(locations.values())
+    scaled = np.round(np.asarray(points, dtype=float) * 1e5).astype(np.int64)
+    deltas = np.diff(scaled, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    # İşaretli değerleri zig-zag ile işaretsize çevir
+    values = np.where(deltas < 0, ~(deltas << 1), deltas << 1)
 
-    # Haritayı noktaların ortalaması civarında başlat
-    center_lat = np.mean([c[0] for c in coords])
-    center_lon = np.mean([c[1] for c in coords])
-    m = folium.Map(location=[center_lat, center_lon], zoom_start=13, tiles="OpenStreetMap")
+    chunks = []
+    for value in values.tolist():
+        while value >= 0x20:
+            chunks.append(chr((0x20 | (value & 0x1f)) + 63))
+            value >>= 5
+        chunks.append(chr(value + 63))
+    return "".join(chunks)
+
+
+def _route_coords(
+    coords: np.ndarray,
+    route: List[int],
+    route_geometry: Optional[np.ndarray]
+) -> np.ndarray:
+    """
+    Çizilecek rota koordinatlarını döner: varsa yol geometrisi,
+    yoksa duraklar arası düz çizgi.
+    """
+    if route_geometry is not None and len(route_geometry) > 0:
+        return np.asarray(route_geometry, dtype=float)
+    return coords[np.asarray(route, dtype=int)]
+
+
+def _stop_positions(n: int, route: List[int]) -> np.ndarray:
+    """
+    Her durak için rotadaki sırayı (1'den başlayarak) döner; rota dışı duraklar 0.
+    """
+    order = np.zeros(n, dtype=int)
+    stops = np.asarray(route[:-1], dtype=int)  # son öğe başlangıca dönüş
+    order[stops[::-1]] = np.arange(len(stops), 0, -1)
+    return order
 
-    # Rota çizgisi (PolyLine)
-    route_coords = [coords[idx] for idx in route]
+
+def _add_standard_layers(
+    m: folium.Map,
+    location_names: List[str],
+    coords: np.ndarray,
+    route: List[int],
+    route_coords: np.ndarray
+) -> None:
+    """
+    Az sayıda durak için her durağa ayrı Marker ve tam PolyLine ekler.
+    """
     folium.PolyLine(
-        locations=route_coords,
+        locations=route_coords.tolist(),
         color="red",
         weight=3,
         opacity=0.8
@@ -53,7 +190,7 @@ def show_route_map(
         ).add_to(m)
 
     # Rotada olmayan noktaları gri simgeyle ekle
-    remaining = set(range(len(location_names))) - set(route)
+    remaining = np.flatnonzero(_stop_positions(len(location_names), route) == 0)
     for idx in remaining:
         name = location_names[idx]
         lat, lon = coords[idx]
@@ -63,4 +200,146 @@ def show_route_map(
             icon=folium.Icon(color="gray", icon="home")
         ).add_to(m)
 
-    st_folium(m, width=map_width, height=map_height)
+
+def _add_high_volume_layers(
+    m: folium.Map,
+    location_names: List[str],
+    coords: np.ndarray,
+    route: List[int],
+    route_coords: np.ndarray
+) -> None:
+    """
+    Çok sayıda durak için tek bir kümelenmiş katman ve kodlanmış rota çizgisi ekler.
+    """
+    _EncodedPolyLine(
+        encode_polyline(route_coords),
+        color="red",
+        weight=3,
+        opacity=0.8
+    ).add_to(m)
+
+    order = _stop_positions(len(location_names), route)
+    rounded = np.round(coords, 5).tolist()
+    data = [
+        [lat, lon, name, pos]
+        for (lat, lon), name, pos in zip(rounded, location_names, order.tolist())
+    ]
+    FastMarkerCluster(data, callback=_CLUSTER_CALLBACK).add_to(m)
+
+
+def show_route_map(
+    location_names: Sequence[str],
+    coords: np.ndarray,
+    route: List[int],
+    map_width: int = 800,
+    map_height: int = 500,
+    route_geometry: Optional[np.ndarray] = None,
+    zoom_start: int = 13,
+    high_volume_threshold: int = HIGH_VOLUME_THRESHOLD
+) -> None:
+    """
+    Teslimat noktalarını ve en iyi rotayı Folium haritasında çizer.
+    Args:
+      - location_names: Durak adları (aynı adlar olabilir).
+      - coords: (n x 2) [latitude, longitude] dizisi.
+      - route: [0, 2, 1, 3, 0] gibi indekslerden oluşan rota listesi.
+      - map_width/map_height: Harita boyutları (Streamlit görünümü için).
+      - route_geometry: Gerçek yol geometrisi ((lat, lon) dizisi). Verilmezse
+        duraklar arasında düz çizgi çizilir.
+      - zoom_start: Haritanın başlangıç zoom seviyesi.
+      - high_volume_threshold: Durak sayısı bu değeri aşarsa kümelenmiş,
+        hafif yüksek hacim moduna geçilir.
+    """
+    location_names = list(location_names)
+    coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+
+    # Haritayı noktaların ortalaması civarında başlat
+    center_lat, center_lon = coords.mean(axis=0)
+    m = folium.Map(location=[center_lat, center_lon], zoom_start=zoom_start, tiles="OpenStreetMap")
+
+    route_coords = _route_coords(coords, route, route_geometry)
+    if len(location_names) > high_volume_threshold:
+        _add_high_volume_layers(m, location_names, coords, route, route_coords)
+    else:
+        _add_standard_layers(m, location_names, coords, route, route_coords)
+
+    # Haritadan geri veri okunmadığı için Streamlit'e nesne döndürülmez
+    st_folium(m, width=map_width, height=map_height, returned_objects=[])
+
+
+def show_fleet_map(
+    location_names: Sequence[str],
+    coords: np.ndarray,
+    routes: List[List[int]],
+    map_width: int = 800,
+    map_height: int = 500,
+    route_geometries: Optional[List[np.ndarray]] = None,
+    zoom_start: int = 13,
+    high_volume_threshold: int = HIGH_VOLUME_THRESHOLD
+) -> None:
+    """
+    Çok araçlı (CVRP) çözümdeki her aracın rotasını ayrı renkte çizer.
+    Args:
+      - location_names: Durak adları (aynı adlar olabilir).
+      - coords: (n x 2) [latitude, longitude] dizisi.
+      - routes: Her araç için depoda başlayıp biten rota listesi.
+      - map_width/map_height: Harita boyutları (Streamlit görünümü için).
+      - route_geometries: Her rota için gerçek yol geometrisi (opsiyonel).
+      - zoom_start: Haritanın başlangıç zoom seviyesi.
+      - high_volume_threshold: Durak sayısı bu değeri aşarsa kümelenmiş,
+        hafif yüksek hacim moduna geçilir.
+    """
+    location_names = list(location_names)
+    coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+    high_volume = len(location_names) > high_volume_threshold
+
+    center_lat, center_lon = coords.mean(axis=0)
+    m = folium.Map(location=[center_lat, center_lon], zoom_start=zoom_start, tiles="OpenStreetMap")
+
+    cluster_rows = []
+    for k, route in enumerate(routes):
+        color = VEHICLE_COLORS[k % len(VEHICLE_COLORS)]
+        geometry = route_geometries[k] if route_geometries is not None else None
+        route_coords = _route_coords(coords, route, geometry)
+        if high_volume:
+            _EncodedPolyLine(encode_polyline(route_coords), color=color, weight=3, opacity=0.8).add_to(m)
+        else:
+            folium.PolyLine(
+                locations=route_coords.tolist(),
+                color=color,
+                weight=3,
+                opacity=0.8,
+                tooltip=f"Araç {k + 1}"
+            ).add_to(m)
+
+        stops = route[1:-1]  # depo hariç
+        if high_volume:
+            rounded = np.round(coords[stops], 5).tolist()
+            cluster_rows.extend(
+                [lat, lon, location_names[idx], k + 1, pos, color]
+                for pos, ((lat, lon), idx) in enumerate(zip(rounded, stops), start=1)
+            )
+            continue
+        for pos, idx in enumerate(stops, start=1):
+            folium.CircleMarker(
+                location=coords[idx].tolist(),
+                radius=6,
+                color=color,
+                fill=True,
+                fill_opacity=0.8,
+                popup=f"<b>{location_names[idx]}</b><br>Araç {k + 1}, Sıra: {pos}"
+            ).add_to(m)
+
+    if cluster_rows:
+        FastMarkerCluster(cluster_rows, callback=_FLEET_CLUSTER_CALLBACK).add_to(m)
+
+    # Depo işaretçisi
+    if routes:
+        depot = routes[0][0]
+        folium.Marker(
+            location=coords[depot].tolist(),
+            popup=f"<b>{location_names[depot]}</b><br>Depo",
+            icon=folium.Icon(color="darkgreen", icon="home")
+        ).add_to(m)
+
+    st_folium(m, width=map_width, height=map_height, returned_objects=[])
@@ -3,13 +3,20 @@
 src/ui/plots.py
 
 Plotly kullanarak ACO algoritmasının konverjans grafiğini
-ve mesafe matrisinin ısı haritasını çizer.
+ve mesafe matrisinin ısı haritasını çizer. Büyük matrisler etiketsiz
+ve gerekirse blok blok küçültülmüş olarak çizilir.
 """
 
 import pandas as pd
 import plotly.express as px
 import streamlit as st
 import numpy as np
+from typing import List, Optional, Tuple
+
+# Bu boyuta kadar her hücreye değer yazılır (n² metin nesnesi)
+HEATMAP_ANNOTATION_LIMIT = 30
+# Isı haritasının en büyük kenar uzunluğu; daha büyük matrisler blok blok küçültülür
+HEATMAP_MAX_SIZE = 200
 
 def plot_convergence(history: list):
     """
@@ -29,24 +36,114 @@ def plot_convergence(history: list):
     )
     st.plotly_chart(fig, use_container_width=True)
 
-def show_distance_matrix_heatmap(dist_matrix: np.ndarray, location_names: list):
+def _route_order(n: int, route: Optional[List[int]]) -> np.ndarray:
+    """
+    Rota sırasındaki durak indekslerini, ardından rota dışı durakları döner.
+    """
+    if not route:
+        return np.arange(n)
+    stops = np.asarray(route, dtype=int)
+    _, first = np.unique(stops, return_index=True)
+    visited = stops[np.sort(first)]
+    mask = np.ones(n, dtype=bool)
+    mask[visited] = False
+    return np.concatenate((visited, np.flatnonzero(mask)))
+
+def _block_downsample(
+    matrix: np.ndarray,
+    labels: List[str],
+    max_size: int,
+    aggregation: str = "min"
+) -> Tuple[np.ndarray, List[str]]:
+    """
+    (n x n) matrisi blok blok birleştirerek en fazla (max_size x max_size) boyuta indirir.
+    Args:
+      - matrix: Kare mesafe matrisi.
+      - labels: Satır/sütun etiketleri.
+      - max_size: Çıktının en büyük kenar uzunluğu.
+      - aggregation: "min" veya "mean" (blok içi birleştirme yöntemi).
+    Returns:
+      - (küçültülmüş matris, blok etiketleri)
+    """
+    if aggregation not in ("min", "mean"):
+        raise ValueError(f"Geçersiz birleştirme yöntemi: {aggregation}")
+
+    n = matrix.shape[0]
+    block = int(np.ceil(n / max_size))
+    m = int(np.ceil(n / block))
+    pad = m * block - n
+
+    padded = np.pad(matrix.astype(float), ((0, pad), (0, pad)), constant_values=np.nan)
+    blocks = padded.reshape(m, block, m, block)
+    reducer = np.nanmin if aggregation == "min" else np.nanmean
+    reduced = reducer(blocks, axis=(1, 3))
+
+    block_labels = [
+        f"{labels[i * block]} (+{min(block, n - i * block) - 1})"
+        for i in range(m)
+    ]
+    return reduced, block_labels
+
+def show_distance_matrix_heatmap(
+    dist_matrix: np.ndarray,
+    location_names: list,
+    route: Optional[List[int]] = None,
+    annotate_limit: int = HEATMAP_ANNOTATION_LIMIT,
+    max_size: int = HEATMAP_MAX_SIZE,
+    aggregation: str = "min"
+):
     """
     Mesafe matrisini ısısal harita (heatmap) olarak çizer.
+    - n <= annotate_limit ise her hücreye değer yazılır (annotated heatmap).
+    - Daha büyük matrisler etiketsiz Heatmap olarak çizilir.
+    - n > max_size ise matris blok blok (min/ortalama) küçültülür.
     Args:
       - dist_matrix: (n x n) mesafe matrisi (numpy array).
       - location_names: [ "Yer1", "Yer2", ... ] listesi.
+      - route: Verilirse satır/sütunlar rota sırasına göre dizilir.
+      - annotate_limit: Hücre değerlerinin yazılacağı en büyük n.
+      - max_size: Çizilecek en büyük kenar uzunluğu.
+      - aggregation: Küçültmede blok birleştirme yöntemi ("min" veya "mean").
     """
-    import plotly.figure_factory as ff
+    import plotly.graph_objects as go
+
+    n = dist_matrix.shape[0]
+    order = _route_order(n, route)
+    matrix = dist_matrix[np.ix_(order, order)]
+    names = np.asarray(location_names, dtype=object)[order]
+    # Aynı adlı duraklar olabildiği için etiketler sıra numarasıyla tekilleştirilir;
+    # Plotly aynı kategori etiketlerini tek satır/sütunda birleştirir.
+    # Blok etiketleri de her bloğun ilk (tekil) etiketinden üretildiği için tekildir.
+    labels = [f"{pos}. {name}" for pos, name in enumerate(names, start=1)]
+
+    title = "Mesafe Matrisi Isı Haritası (km)"
+    if n <= annotate_limit:
+        import plotly.figure_factory as ff
+
+        fig = ff.create_annotated_heatmap(
+            z=matrix.round(2).tolist(),
+            x=labels,
+            y=labels,
+            colorscale="Viridis",
+            showscale=True
+        )
+    else:
+        if n > max_size:
+            matrix, labels = _block_downsample(matrix, labels, max_size, aggregation)
+            title += f" — {n}x{n} → {len(labels)}x{len(labels)} ({aggregation})"
+        fig = go.Figure(go.Heatmap(
+            z=matrix,
+            x=labels,
+            y=labels,
+            colorscale="Viridis",
+            showscale=True,
+            hovertemplate="%{y} → %{x}<br>%{z:.2f} km<extra></extra>"
+        ))
+        fig.update_xaxes(showticklabels=len(labels) <= annotate_limit * 2)
+        fig.update_yaxes(showticklabels=len(labels) <= annotate_limit * 2, autorange="reversed")
 
-    fig = ff.create_annotated_heatmap(
-        z=dist_matrix.round(2).tolist(),
-        x=location_names,
-        y=location_names,
-        colorscale="Viridis",
-        showscale=True
-    )
     fig.update_layout(
-        title="Mesafe Matrisi Isı Haritası (km)",
+        title=title,
         width=700,
         height=700
     )